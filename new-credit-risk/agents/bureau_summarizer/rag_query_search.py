@@ -4,12 +4,16 @@
 # This script performs a semantic search query using a sentence embedding
 # vector and Azure AI Search's vector index API.
 
-import requests
 import json
-from sentence_transformers import SentenceTransformer
 import os
+import sys
 from dotenv import load_dotenv
 
+# Make the project root importable when run as a script
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+from core.embeddings import embed_texts_cached, get_embedding_model
+from core.search_transport import get_search_transport
+
 # Load environment variables from .env file in the root directory
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '..', '.env'))
 
@@ -34,10 +38,10 @@ query_text = "What are the total assets and liabilities for the company?"
 # =====================================
 
 # Load a pretrained transformer model for sentence embedding
-model = SentenceTransformer("all-MiniLM-L6-v2")
+model = get_embedding_model()
 
-# Convert query to vector format compatible with Azure vector search
-query_vector = model.encode(query_text).tolist()
+# Convert query to vector format compatible with Azure vector search (cached after the first run)
+query_vector = embed_texts_cached(model, [query_text])[0].tolist()
 
 # =====================================
 # Construct Azure Search Request
@@ -67,7 +71,8 @@ payload = {
 # Send the Search Request
 # =====================================
 
-response = requests.post(url, headers=headers, json=payload)
+# Pooled session with connect/read timeouts and retries on 429/503
+response = get_search_transport().post(url, operation="vector_search", headers=headers, json=payload)
 response.raise_for_status()  # Raise error if request failed
 results = response.json()
 
@@ -11,7 +11,6 @@ import os
 import uuid
 import docx2txt
 import pandas as pd
-from sentence_transformers import SentenceTransformer
 from azure.core.credentials import AzureKeyCredential
 from azure.search.documents.indexes import SearchIndexClient
 from azure.search.documents import SearchClient
@@ -22,8 +21,13 @@ from azure.search.documents.indexes.models import (
 )
 from azure.storage.blob import BlobServiceClient
 import os
+import sys
 from dotenv import load_dotenv
 
+# Make the project root importable when run as a script
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+from core.embeddings import embed_texts_cached, get_embedding_model
+
 # =====================================
 # Configuration
 # =====================================
@@ -51,8 +55,8 @@ BLOB_CONNECTION_STRING = (
 DOWNLOAD_FOLDER = os.path.join("output_data")
 os.makedirs(DOWNLOAD_FOLDER, exist_ok=True)
 
-# Load SentenceTransformer model for text embedding
-model = SentenceTransformer("all-MiniLM-L6-v2")
+# SentenceTransformer model for text embedding (shared provider, loaded once)
+model = get_embedding_model()
 
 # =====================================
 # Define Search Index Schema
@@ -60,6 +64,8 @@ model = SentenceTransformer("all-MiniLM-L6-v2")
 
 fields = [
     SimpleField(name="id", type=SearchFieldDataType.String, key=True),
+    # Company the chunk belongs to; filterable so vector queries can be pre-filtered per company
+    SimpleField(name="company_id", type=SearchFieldDataType.String, filterable=True),
     SearchableField(name="filename", type=SearchFieldDataType.String),
     SearchableField(name="content", type=SearchFieldDataType.String),
     SearchField(
@@ -86,11 +92,11 @@ index = SearchIndex(name=INDEX_NAME, fields=fields, vector_search=vector_search)
 print(f"Creating index: {INDEX_NAME} with fields: {fields}")
 
 
-# Create the index on Azure
+# Create the index on Azure (or add new fields such as company_id to an existing one)
 index_client = SearchIndexClient(endpoint=AZURE_SEARCH_ENDPOINT, credential=AzureKeyCredential(AZURE_SEARCH_KEY))
 try:
-    index_client.create_index(index)
-    print(f"✅ Created index: {INDEX_NAME}")
+    index_client.create_or_update_index(index)
+    print(f"✅ Created/updated index: {INDEX_NAME}")
 except Exception as e:
     print(f"⚠️ Index creation failed: {e}")
 
@@ -131,17 +137,18 @@ for blob in blobs:
         with open(download_path, "r", encoding="utf-8", errors="ignore") as f:
             content = f.read()
 
-    # Generate vector embedding
-    embedding = model.encode(content).tolist()
-
-    # Prepare document for upload
+    # Prepare document for upload (vectors are added below in one batched call)
     documents.append({
         "id": str(uuid.uuid4()),
         "filename": blob.name,
-        "content": content,
-        "content_vector": embedding
+        "content": content
     })
 
+# Generate vector embeddings for all documents in batches (unchanged files come from the embedding cache)
+embeddings = embed_texts_cached(model, [doc["content"] for doc in documents])
+for doc, embedding in zip(documents, embeddings):
+    doc["content_vector"] = embedding.tolist()
+
 # =====================================
 # Upload to Azure Vector Search Index
 # =====================================
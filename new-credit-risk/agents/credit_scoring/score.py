@@ -20,11 +20,13 @@ def init():
     """
     global model
 
-    # Use a relative path to access the saved model
-    model_path = os.path.join("agents", "credit_scoring", "credit_scoring_model.joblib")
-
-    # Load the trained model into memory
-    model = joblib.load(model_path)
+    try:
+        # Inside the app: load the model through the shared registry (loaded once per process)
+        from core.model_registry import get_model
+        model = get_model("credit_scoring")
+    except ImportError:
+        # Deployed or run on its own (no `core` package): load the artifact next to this script
+        model = joblib.load(os.path.join(os.path.dirname(os.path.abspath(__file__)), "credit_scoring_model.joblib"))
 
 # =====================================
 # RUN: Perform Inference
@@ -6,12 +6,12 @@
 
 import os
 import re
-import time
 import shap
 import joblib
 import pandas as pd
 from azure.identity import DefaultAzureCredential
 from azure.ai.projects import AIProjectClient
+from azure.ai.agents.models import ListSortOrder, MessageStreamEvent, RunStatus, ThreadRun
 
 # =====================================
 # STEP 1: Load Summary File
@@ -118,21 +118,22 @@ agent = project.agents.get_agent("asst_oDWcHiwhp6UWnWCUCHs892Bb")
 thread = project.agents.threads.create()
 project.agents.messages.create(thread_id=thread.id, role="user", content="Explain why the default risk is predicted")
 project.agents.messages.create(thread_id=thread.id, role="assistant", content=explanation)
-project.agents.runs.create_and_process(thread_id=thread.id, agent_id=agent.id)
 
-# Poll for assistant response
-max_wait = 10  # seconds
-sleep_interval = 2
-waited = 0
+# Stream the run: the completed assistant message arrives as an event, so no polling is needed
 assistant_reply = None
-
-while waited < max_wait:
-    messages = list(project.agents.messages.list(thread_id=thread.id))
-    assistant_reply = next((m for m in reversed(messages) if m.role == "assistant"), None)
-    if assistant_reply:
-        break
-    time.sleep(sleep_interval)
-    waited += sleep_interval
+run = None
+with project.agents.runs.stream(thread_id=thread.id, agent_id=agent.id) as stream:
+    for event_type, event_data, _ in stream:
+        if isinstance(event_data, ThreadRun):
+            run = event_data
+        elif event_type == MessageStreamEvent.THREAD_MESSAGE_COMPLETED and event_data.role == "assistant":
+            assistant_reply = event_data
+
+# Fall back to the newest message of this run if the stream did not carry it
+if assistant_reply is None and run is not None and run.status == RunStatus.COMPLETED:
+    assistant_reply = next(iter(project.agents.messages.list(
+        thread_id=thread.id, run_id=run.id, order=ListSortOrder.DESCENDING, limit=1
+    )), None)
 
 # =====================================
 # STEP 7: Prettify and Display Output
@@ -3,32 +3,77 @@
 # It uses Flask to expose HTTP endpoints for running various AI/ML pipelines,
 # including bureau summarization, credit scoring, fraud detection, compliance checking,
 # explainability, and a smart controller that orchestrates the entire workflow.
-# Each endpoint reads the latest summary from disk and returns the result as JSON.
+# The agent endpoints read the bureau summary of an analysis (started with /run-bureau)
+# from the in-memory analysis store and return the result as JSON.
 # All core pipelines are imported from the core/ directory.
 
-from flask import Flask, request, jsonify  # Flask web framework for API endpoints
+from flask import Flask, Response, request, jsonify  # Flask web framework for API endpoints
 from core.bureau_pipeline import bureau_agent_pipeline  # Bureau summary pipeline
 from core.credit_pipeline import credit_scoring_pipeline  # Credit scoring pipeline
 from core.fraud_pipeline import fraud_detection_pipeline  # Fraud detection pipeline
 from core.compliance_pipeline import compliance_agent_pipeline  # Compliance checking pipeline
-from core.explainability_pipeline import explainability_agent_pipeline  # Explainability pipeline
+from core.explainability_pipeline import explainability_agent_pipeline, explainability_batch_pipeline  # Explainability pipelines
 from core.smart_pipeline import run_smart_pipeline  # Smart controller pipeline (orchestrates all tools)
 import traceback  # For printing detailed error tracebacks in case of exceptions
 from core.blob_utils import upload_file_to_blob  # Utility for uploading files to Azure Blob Storage
 from mcp.validator import validate_input_against_schema, validate_output_against_schema  # Input/output schema validators
 import json  # For JSON serialization/deserialization
 import os  # For file path operations
+import threading  # Guards the lazily created SK orchestrator
+import queue  # Hands streamed agent results from the SK loop to the response generator
+import time  # Elapsed times in streamed events
+import itertools  # Event IDs for the SSE stream
 from core.agent_registry import AGENT_PIPELINES  # Central registry for all agent pipelines
-import asyncio  # For running asynchronous tasks
-from my_SemanticKernel.my_sk_orchestrator import SemanticKernelOrchestrator
+from core.job_manager import JobManager, JobQueueFull  # Bounded background worker pool for long-running jobs
+from core.event_loop import BackgroundEventLoop  # Long-lived event loop shared by all SK requests
+from core.llm_cache import get_llm_cache  # Persistent cache of Azure agent replies
+from core.model_registry import model_registry  # ML models loaded once per process
+from core.search_transport import get_search_transport  # Pooled HTTP session for Azure Search REST calls
+from core.analysis_store import get_analysis_store  # Per-analysis bureau summaries (LRU + optional disk spill)
+from core.warmup import Warmup, warm_models, warm_embeddings, warm_search, warm_agents, warm_agents_async  # Background warm-up + readiness
 
 # === Flask App Initialization ===
 # This creates the Flask application instance, which will handle all incoming HTTP requests.
 app = Flask(__name__)
 
+# The SK orchestrator is created on the first SK request (or by the warm-up below):
+# importing semantic_kernel takes seconds and the constructor needs the Azure OpenAI
+# settings, so neither may slow down or break the import of this module
+_sk_orchestrator = None
+_sk_orchestrator_lock = threading.Lock()
 
-#Initialize SK orchestrator 
-sk_orchestrator = SemanticKernelOrchestrator()
+def get_sk_orchestrator():
+    """Returns the shared SemanticKernelOrchestrator, creating it on first use."""
+    global _sk_orchestrator
+    with _sk_orchestrator_lock:
+        if _sk_orchestrator is None:
+            from my_SemanticKernel.my_sk_orchestrator import SemanticKernelOrchestrator
+            _sk_orchestrator = SemanticKernelOrchestrator()
+        return _sk_orchestrator
+
+# All SK coroutines run on one background event loop, so the kernel and the pooled
+# HTTP connections of its chat client stay warm across requests
+sk_loop = BackgroundEventLoop(name="sk-event-loop")
+SK_REQUEST_TIMEOUT = float(os.getenv("SK_REQUEST_TIMEOUT", "600"))  # Seconds before an SK request is cancelled
+
+# Background job manager used by the asynchronous job endpoints
+job_manager = JobManager()
+
+# === Background Warm-up ===
+# Loads the ML models (with the SHAP explainer) and the embedding model, opens the
+# search connection, resolves the agent handles for the sync client and for the
+# async client on the SK loop, and builds the SK orchestrator, all on a daemon
+# thread. The app accepts requests right after import (a request that arrives
+# first loads what it needs itself); /ready reports when every component is warm.
+warmup = Warmup(enabled=os.getenv("MODEL_WARMUP", "true").lower() == "true")
+warmup.add("models", warm_models)
+warmup.add("embeddings", warm_embeddings)
+warmup.add("search", warm_search)
+warmup.add("agents", warm_agents)
+warmup.add("agents_async", lambda: sk_loop.run(warm_agents_async(), timeout=SK_REQUEST_TIMEOUT))
+warmup.add("sk_orchestrator", get_sk_orchestrator)
+if __name__ != "__mp_main__":  # Not in the parse pool's forkserver, which imports this script as __mp_main__
+    warmup.start()
 
 # === Health Check Endpoint ===
 @app.route("/", methods=["GET"])
@@ -39,19 +84,97 @@ def index():
     """
     return "API is up and running!"
 
+# === Readiness Endpoint ===
+@app.route("/ready", methods=["GET"])
+def ready():
+    """
+    Readiness check for load balancers.
+    Returns HTTP 200 once every required component is warm and HTTP 503 while warm-up
+    is still running (or failed), with the state and timing of each component.
+    """
+    status = warmup.status()
+    return jsonify(status), 200 if status["ready"] else 503
+
+# === Analysis Contexts ===
+# /run-bureau stores the bureau summary of every analysis under a new analysis ID.
+# The agent endpoints take that ID ("analysis_id" in the JSON body or the query
+# string) and read the summary from memory, so concurrent analyses of different
+# companies stay separate. Without an ID they fall back to the legacy shared file.
+analysis_store = get_analysis_store()
+LEGACY_SUMMARY_PATH = os.path.join("output_data", "rag_summary.txt")
+
+def _request_analysis_id():
+    """Returns the analysis ID sent with the request, or None."""
+    body = request.get_json(silent=True) or {}
+    analysis_id = body.get("analysis_id") or request.args.get("analysis_id")
+    return str(analysis_id) if analysis_id else None
+
+def _load_summary(analysis_id):
+    """Returns the analysis' bureau summary (None if the ID is unknown or expired), or the legacy file without an ID."""
+    if analysis_id is None:
+        with open(LEGACY_SUMMARY_PATH, encoding="utf-8") as f:
+            return f.read()
+    return analysis_store.get_summary(analysis_id)
+
+def _create_analysis(bureau_result):
+    """Stores a completed bureau result as a new analysis context and returns its ID."""
+    summary = (bureau_result.get("summary") or "").strip() or "No detailed financial summary available."
+    company = (bureau_result.get("extractedData") or {}).get("company_name")
+    return analysis_store.create(summary, bureau=bureau_result, company=company)
+
+def _unknown_analysis(analysis_id):
+    return jsonify({"error": f"Unknown or expired analysis: {analysis_id}"}), 404
+
+# === Bureau Endpoint ===
+@app.route("/run-bureau", methods=["POST"])
+def run_bureau():
+    """
+    Endpoint to run the bureau summarizer and start a new analysis.
+    Stores the bureau summary in the analysis context store and returns the bureau
+    result with its "analysis_id"; pass that ID to /run-fraud, /run-compliance and
+    /run-explainability.
+    """
+    try:
+        bureau_result = bureau_agent_pipeline()
+        if bureau_result.get("status") != "AgentStatus.complete":
+            return jsonify(bureau_result), 500
+        analysis_id = _create_analysis(bureau_result)
+        return jsonify({**bureau_result, "analysis_id": analysis_id}), 200
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/analyses/stats", methods=["GET"])
+def analysis_stats():
+    """Reports how many analysis contexts are held in memory / spilled and the hit/miss/eviction counters."""
+    return jsonify(analysis_store.stats()), 200
+
+@app.route("/analyses/<analysis_id>", methods=["GET"])
+def get_analysis(analysis_id):
+    """Returns an analysis context: company, bureau summary and result, and the agent results recorded so far."""
+    context = analysis_store.get(analysis_id)
+    if context is None:
+        return _unknown_analysis(analysis_id)
+    return jsonify(context), 200
+
 # === Fraud Detection Endpoint ===
 @app.route("/run-fraud", methods=["POST"])
 def run_fraud():
     """
     Endpoint to run the fraud detection pipeline.
-    Reads the summary text from the output_data folder, runs the fraud detection pipeline,
-    and returns the result as JSON.
+    Reads the bureau summary of the given analysis ID from the analysis store,
+    runs the fraud detection pipeline, and returns the result as JSON.
     """
     try:
-        # Read the latest summary text from disk (output_data/rag_summary.txt)
-        summary_text = open("output_data/rag_summary.txt", encoding="utf-8").read()
+        # Look up the summary of this analysis (legacy: output_data/rag_summary.txt)
+        analysis_id = _request_analysis_id()
+        summary_text = _load_summary(analysis_id)
+        if summary_text is None:
+            return _unknown_analysis(analysis_id)
         # Run the fraud detection pipeline on the summary
         fraud_result = fraud_detection_pipeline(summary_text)
+        if analysis_id:
+            analysis_store.add_result(analysis_id, "fraud", fraud_result)
         # Return the result as a JSON response with HTTP 200 status
         return jsonify(fraud_result), 200
     except Exception as e:
@@ -63,12 +186,17 @@ def run_fraud():
 def run_compliance():
     """
     Endpoint to run the compliance checking pipeline.
-    Reads the summary text from the output_data folder, runs the compliance pipeline,
-    and returns the result as JSON.
+    Reads the bureau summary of the given analysis ID from the analysis store,
+    runs the compliance pipeline, and returns the result as JSON.
     """
     try:
-        summary_text = open("output_data/rag_summary.txt", encoding="utf-8").read()
+        analysis_id = _request_analysis_id()
+        summary_text = _load_summary(analysis_id)
+        if summary_text is None:
+            return _unknown_analysis(analysis_id)
         compliance_result = compliance_agent_pipeline(summary_text)
+        if analysis_id:
+            analysis_store.add_result(analysis_id, "compliance", compliance_result)
         return jsonify(compliance_result), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -78,16 +206,38 @@ def run_compliance():
 def run_explainability():
     """
     Endpoint to run the explainability pipeline.
-    Reads the summary text from the output_data folder, runs the explainability pipeline,
-    and returns the result as JSON.
+    Reads the bureau summary of the given analysis ID from the analysis store,
+    runs the explainability pipeline, and returns the result as JSON.
     """
     try:
-        summary_text = open("output_data/rag_summary.txt", encoding="utf-8").read()
+        analysis_id = _request_analysis_id()
+        summary_text = _load_summary(analysis_id)
+        if summary_text is None:
+            return _unknown_analysis(analysis_id)
         explain_result = explainability_agent_pipeline(summary_text)
+        if analysis_id:
+            analysis_store.add_result(analysis_id, "explainability", explain_result)
         return jsonify(explain_result), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# === Batch Explainability Endpoint ===
+@app.route("/run-explainability-batch", methods=["POST"])
+def run_explainability_batch():
+    """
+    Endpoint to compute SHAP explanations for many summaries in one vectorized call.
+    Expects a JSON body like {"summaries": ["...", "..."]} and returns one
+    explanation per summary (same order), without LLM narratives.
+    """
+    try:
+        data = request.get_json(force=True) or {}
+        summaries = data.get("summaries")
+        if not isinstance(summaries, list) or not all(isinstance(s, str) for s in summaries):
+            return jsonify({"error": "'summaries' must be a list of strings"}), 400
+        return jsonify({"explanations": explainability_batch_pipeline(summaries)}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 # === Smart Controller Endpoint ===
 @app.route("/run-smart-controller", methods=["POST"])
 def run_smart_controller():
@@ -118,11 +268,8 @@ def run_sk_smart_controller():
         
         print(f"Processing requirements: {requirements}")
         
-        #Run async orchestrator
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        result = loop.run_until_complete(sk_orchestrator.run_smart_analysis(requirements))
-        loop.close()
+        #Run async orchestrator on the shared background loop
+        result = sk_loop.run(get_sk_orchestrator().run_smart_analysis(requirements), timeout=SK_REQUEST_TIMEOUT)
 
         return jsonify(result), 200
     except Exception as e:
@@ -134,17 +281,169 @@ def run_sk_smart_controller():
 def run_sk_credit_analysis():
     """Full credit analysis using SK orchestration."""
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        result = loop.run_until_complete(
-            sk_orchestrator.run_credit_analysis()
-        )
-        loop.close()
-        
+        result = sk_loop.run(get_sk_orchestrator().run_credit_analysis(), timeout=SK_REQUEST_TIMEOUT)
+
         return jsonify({"analysis": result}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# === Streaming Endpoint (Server-Sent Events) ===
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))  # Keep-alive comment interval
+
+def _sse_event(event, data, event_id):
+    """Formats one Server-Sent Event with a JSON payload (json.dumps escapes newlines, so one data line suffices)."""
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@app.route("/run-sk-smart-controller/stream", methods=["GET", "POST"])
+def stream_sk_smart_controller():
+    """
+    Streams the SK smart analysis as Server-Sent Events (text/event-stream).
+    Emits "started" with the planned agents, one "agent_result" per agent as soon as it
+    finishes (the bureau summary first, then credit, fraud, explainability and compliance
+    in completion order), and finally "complete" with all results, or "error".
+    Requirements come from the JSON body ({"requirements": [...]}) or, for EventSource
+    clients, from the query string (?requirements=fraud,compliance).
+    """
+    body = request.get_json(silent=True) or {}
+    requirements = body.get("requirements")
+    if requirements is None and request.args.get("requirements"):
+        requirements = [r for r in request.args["requirements"].split(",") if r.strip()]
+    try:
+        orchestrator = get_sk_orchestrator()
+        from my_SemanticKernel.pipeline_graph import CREDIT_RISK_GRAPH, resolve_plan
+        plan = resolve_plan(requirements or [])
+        if plan is None:
+            return jsonify({"error": "Streaming runs the pipeline graph; requirements must name agents "
+                                     "(bureau, credit, fraud, explainability, compliance)"}), 400
+        agents = CREDIT_RISK_GRAPH.resolve(plan or None)
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+    # The graph reports each finished node on the SK loop thread; the generator below
+    # turns the queued results into events on the request thread
+    events = queue.Queue()
+    started = time.monotonic()
+    future = sk_loop.submit(orchestrator.run_graph_analysis(
+        targets=plan or None, on_result=lambda name, output: events.put((name, output))
+    ))
+    future.add_done_callback(lambda _: events.put((None, None)))
+
+    def generate():
+        analysis_id = None
+        deadline = started + SK_REQUEST_TIMEOUT
+        yield _sse_event("started", {"agents": agents}, 0)
+        try:
+            for event_id in itertools.count(1):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    yield _sse_event("error", {"error": f"Analysis timed out after {SK_REQUEST_TIMEOUT}s",
+                                               "analysis_id": analysis_id}, event_id)
+                    return
+                try:
+                    name, output = events.get(timeout=min(SSE_HEARTBEAT_SECONDS, remaining))
+                except queue.Empty:
+                    yield ": keep-alive\n\n"  # Comment line; keeps proxies from closing an idle stream
+                    continue
+                elapsed = round(time.monotonic() - started, 3)
+
+                if name is not None:
+                    # Keep the results in the analysis store, like /run-bureau and the agent endpoints
+                    if name == "bureau_summary" and output.get("status") != "AgentStatus.failed":
+                        analysis_id = _create_analysis(output)
+                    elif analysis_id:
+                        analysis_store.add_result(analysis_id, name, output)
+                    yield _sse_event("agent_result", {"agent": name, "result": output, "analysis_id": analysis_id,
+                                                      "elapsed_seconds": elapsed}, event_id)
+                    continue
+
+                try:
+                    results = future.result()
+                except Exception as e:
+                    yield _sse_event("error", {"error": str(e), "analysis_id": analysis_id}, event_id)
+                    return
+                yield _sse_event("complete", {"results": results, "analysis_id": analysis_id,
+                                              "elapsed_seconds": elapsed}, event_id)
+                return
+        finally:
+            future.cancel()  # No-op once finished; stops the agents if the client disconnected or timed out
+
+    return Response(generate(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",  # Disable response buffering in nginx-style proxies
+    })
+
+
+# === Asynchronous Job Endpoints ===
+# Long-running analyses are queued on the job manager and polled by job ID,
+# so the HTTP worker is released as soon as the job has been accepted.
+
+def _run_sk_smart_analysis(requirements):
+    """Runs the SK smart analysis on the shared SK loop and waits for it on the job worker thread."""
+    return sk_loop.run(get_sk_orchestrator().run_smart_analysis(requirements), timeout=SK_REQUEST_TIMEOUT)
+
+@app.route("/jobs/sk-smart-controller", methods=["POST"])
+def submit_sk_smart_controller_job():
+    """
+    Queues a Semantic Kernel smart analysis and returns its job ID immediately (HTTP 202).
+    Returns HTTP 503 when the job queue is full.
+    """
+    body = request.get_json(silent=True) or {}
+    requirements = body.get("requirements", [])
+    try:
+        job_id = job_manager.submit("sk-smart-controller", _run_sk_smart_analysis, requirements)
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 503
+    return jsonify({
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": f"/jobs/{job_id}",
+        "result_url": f"/jobs/{job_id}/result"
+    }), 202
+
+@app.route("/jobs/stats", methods=["GET"])
+def job_stats():
+    """Reports worker count, queue depth and average queue/run times."""
+    return jsonify(job_manager.stats()), 200
+
+@app.route("/llm-cache/stats", methods=["GET"])
+def llm_cache_stats():
+    """Reports LLM response cache size, hit/miss counters and hit rate."""
+    return jsonify(get_llm_cache().stats()), 200
+
+@app.route("/models/stats", methods=["GET"])
+def model_stats():
+    """Reports load state, load time and memory footprint of each ML model."""
+    return jsonify(model_registry.stats()), 200
+
+@app.route("/search/stats", methods=["GET"])
+def search_stats():
+    """Per-operation latency, error and retry counts for Azure Search REST calls."""
+    return jsonify(get_search_transport().stats()), 200
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    """Returns the status and timings of a job (without its result payload)."""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+    return jsonify(job), 200
+
+@app.route("/jobs/<job_id>/result", methods=["GET"])
+def job_result(job_id):
+    """
+    Returns the job result once it has completed.
+    Responds with HTTP 202 while the job is still queued or running and HTTP 500 if it failed.
+    """
+    job = job_manager.get(job_id, include_result=True)
+    if job is None:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+    if job["status"] == "completed":
+        return jsonify(job["result"]), 200
+    if job["status"] == "failed":
+        return jsonify({"error": job["error"], "job_id": job_id}), 500
+    return jsonify({"job_id": job_id, "status": job["status"]}), 202
+
 
 # === Main Entrypoint ===
 # This block runs the Flask app when the script is executed directly.
@@ -0,0 +1,81 @@
+# =====================================
+# Benchmark: Single-Call vs Batched Embedding
+# =====================================
+# Measures CPU embedding throughput (chunks/s) for the bureau pipeline's 1000-character
+# chunks: one `model.encode(chunk)` call per chunk (the old loop) versus
+# core.embeddings.embed_texts at several batch sizes. Chunks are cut from the
+# text files in output_data/ (repeated until --chunks is reached).
+#
+# Usage (from the new-credit-risk folder):
+#   python benchmarks/embedding_benchmark.py --chunks 256 --batch-sizes 16 32 64 128 --threads 4
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import numpy as np
+
+# Make the project root importable when run as a script
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sentence_transformers import SentenceTransformer
+from core.embeddings import embed_texts, set_embedding_threads
+
+
+def load_chunks(count, chunk_size=1000):
+    """Cuts `count` chunks of `chunk_size` characters from the output_data text files."""
+    text = "\n".join(
+        open(path, encoding="utf-8", errors="ignore").read()
+        for path in sorted(glob.glob(os.path.join("output_data", "*.txt")))
+    )
+    if not text.strip():
+        raise SystemExit("No text found in output_data/*.txt")
+    while len(text) < count * chunk_size:
+        text += "\n" + text
+    return [text[i * chunk_size:(i + 1) * chunk_size] for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare single-call and batched embedding throughput.")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2", help="SentenceTransformer name or local path")
+    parser.add_argument("--chunks", type=int, default=256, help="Number of 1000-character chunks")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[16, 32, 64, 128])
+    parser.add_argument("--threads", type=int, default=0, help="CPU threads (0 = torch default)")
+    args = parser.parse_args()
+
+    chunks = load_chunks(args.chunks)
+    model = SentenceTransformer(args.model, device="cpu")
+    set_embedding_threads(args.threads)
+    embed_texts(model, chunks[:8])  # Warm up
+
+    results = {}
+
+    started = time.perf_counter()
+    single = np.stack([model.encode(chunk) for chunk in chunks]).astype(np.float32)
+    elapsed = time.perf_counter() - started
+    results["single_call"] = {"seconds": round(elapsed, 3), "chunks_per_second": round(len(chunks) / elapsed, 1)}
+
+    for batch_size in args.batch_sizes:
+        started = time.perf_counter()
+        batched = embed_texts(model, chunks, batch_size=batch_size)
+        elapsed = time.perf_counter() - started
+        results[f"batch_{batch_size}"] = {
+            "seconds": round(elapsed, 3),
+            "chunks_per_second": round(len(chunks) / elapsed, 1),
+            "speedup": round(results["single_call"]["seconds"] / elapsed, 2),
+            "max_abs_diff_vs_single": float(np.abs(batched - single).max()),
+        }
+
+    import torch
+    print(json.dumps({
+        "model": args.model,
+        "chunks": len(chunks),
+        "threads": torch.get_num_threads(),
+        "results": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
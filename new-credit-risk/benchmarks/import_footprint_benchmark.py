@@ -0,0 +1,90 @@
+# =====================================
+# Benchmark: Import Time and Resident Memory
+# =====================================
+# Imports a module in a fresh interpreter (as a worker importing app.py would)
+# and reports the import time, the resident set size (RSS) afterwards and how
+# many SentenceTransformer models are alive. An optional --call expression is
+# then evaluated (e.g. the first embedding request) and measured the same way,
+# so eager and lazy model loading can be compared end to end.
+#
+# Usage (from the new-credit-risk folder):
+#   python benchmarks/import_footprint_benchmark.py --module core.bureau_pipeline --repeat 3
+#   python benchmarks/import_footprint_benchmark.py --module core.bureau_pipeline \
+#       --call "core.embeddings.get_embedding_model().encode(['total assets'])"
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+import statistics
+
+PROJECT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Runs inside the fresh interpreter; prints one JSON line
+PROBE = r"""
+import gc, json, os, sys, time, importlib
+
+def rss_mb():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1e6
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except OSError:
+        import resource  # Peak RSS as a fallback (KB on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1e6 if sys.platform == "darwin" else 1e3)
+
+def models_alive():
+    module = sys.modules.get("sentence_transformers")
+    if module is None:
+        return 0
+    return sum(isinstance(o, module.SentenceTransformer) for o in gc.get_objects())
+
+sys.path.insert(0, os.getcwd())
+result = {"baseline_rss_mb": round(rss_mb(), 1)}
+started = time.perf_counter()
+importlib.import_module(sys.argv[1])
+result["import_seconds"] = round(time.perf_counter() - started, 3)
+result["import_rss_mb"] = round(rss_mb(), 1)
+result["models_after_import"] = models_alive()
+if sys.argv[2]:
+    import core
+    started = time.perf_counter()
+    eval(sys.argv[2], {"core": core})
+    result["call_seconds"] = round(time.perf_counter() - started, 3)
+    result["call_rss_mb"] = round(rss_mb(), 1)
+    result["models_after_call"] = models_alive()
+print(json.dumps(result))
+"""
+
+
+def run_once(module, call):
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE, module, call or ""],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import time and RSS of a module in a fresh interpreter.")
+    parser.add_argument("--module", default="core.bureau_pipeline", help="Module to import")
+    parser.add_argument("--call", default="", help="Expression evaluated after the import (`core` is in scope)")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters to average over")
+    args = parser.parse_args()
+
+    runs = [run_once(args.module, args.call) for _ in range(args.repeat)]
+    summary = {
+        key: round(statistics.median(run[key] for run in runs), 3)
+        for key in runs[0]
+    }
+    print(json.dumps({"module": args.module, "call": args.call or None, "runs": len(runs), "median": summary}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# =====================================
+# Benchmark: LLM-Driven vs Graph Orchestration
+# =====================================
+# Compares end-to-end latency of SemanticKernelOrchestrator.run_smart_analysis in
+# "llm" mode (GPT auto function calling) and "graph" mode (direct pipeline graph
+# execution with maximum parallelism). Requires the same Azure configuration as app.py.
+#
+# Usage (from the new-credit-risk folder):
+#   python benchmarks/orchestration_benchmark.py --runs 3
+
+import os
+import sys
+import time
+import json
+import asyncio
+import argparse
+import statistics
+
+# Make the project root importable when run as a script
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from my_SemanticKernel.my_sk_orchestrator import SemanticKernelOrchestrator
+
+
+def summarize(latencies):
+    """Returns min/median/mean/max of a list of latencies (seconds)."""
+    return {
+        "runs": len(latencies),
+        "min": round(min(latencies), 2),
+        "median": round(statistics.median(latencies), 2),
+        "mean": round(statistics.mean(latencies), 2),
+        "max": round(max(latencies), 2),
+    }
+
+
+async def benchmark(orchestrator, mode, runs):
+    latencies, completed = [], []
+    for i in range(runs):
+        started = time.perf_counter()
+        result = await orchestrator.run_smart_analysis([], mode=mode)
+        latencies.append(time.perf_counter() - started)
+        completed.append(sum(1 for v in result.values() if v and "error" not in v and v.get("status") != "AgentStatus.failed"))
+        print(f"[{mode}] run {i + 1}/{runs}: {latencies[-1]:.2f}s, {completed[-1]}/5 agents succeeded")
+    return {**summarize(latencies), "agents_succeeded": completed}
+
+
+async def main(runs, modes):
+    orchestrator = SemanticKernelOrchestrator()
+    report = {}
+    for mode in modes:
+        report[mode] = await benchmark(orchestrator, mode, runs)
+
+    print("\n=== Orchestration latency (seconds) ===")
+    print(json.dumps(report, indent=2))
+    if "llm" in report and "graph" in report:
+        speedup = report["llm"]["median"] / report["graph"]["median"]
+        print(f"\nGraph mode median speedup over LLM mode: {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare LLM-driven and graph orchestration latency")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per mode")
+    parser.add_argument("--modes", nargs="+", default=["llm", "graph"], choices=["llm", "graph"])
+    args = parser.parse_args()
+    asyncio.run(main(args.runs, args.modes))
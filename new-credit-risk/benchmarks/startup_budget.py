@@ -0,0 +1,89 @@
+# =====================================
+# Startup-Time Budget Check
+# =====================================
+# Imports app.py in fresh interpreters (as a gunicorn/Flask worker does on boot)
+# and fails when the median import time exceeds the budget, when the import
+# raises (e.g. because Azure settings are missing or Azure is unreachable), or
+# when a heavy library that should load on first use or during the background
+# warm-up was imported eagerly.
+# The background warm-up is switched off for the measurement (MODEL_WARMUP=false),
+# so only the import itself is timed.
+#
+# Usage (from the new-credit-risk folder):
+#   python benchmarks/startup_budget.py
+#   python benchmarks/startup_budget.py --budget 1.5 --repeat 5
+# Exit code 0 = within budget, 1 = over budget / eager import / import error.
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+import statistics
+
+PROJECT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", "2.0"))
+
+# Must not be imported by `import app`
+DEFERRED_MODULES = [
+    "shap",
+    "sentence_transformers",
+    "torch",
+    "semantic_kernel",
+    "pandas",
+    "docx",
+    "openpyxl",
+    "azure.identity",
+    "azure.ai.projects",
+    "azure.ai.agents",
+    "azure.storage.blob",
+]
+
+# Runs inside the fresh interpreter; prints one JSON line
+PROBE = r"""
+import sys, json, time, importlib
+sys.path.insert(0, ".")
+started = time.perf_counter()
+importlib.import_module(sys.argv[1])
+seconds = time.perf_counter() - started
+print(json.dumps({"import_seconds": round(seconds, 3),
+                  "loaded": [m for m in json.loads(sys.argv[2]) if m in sys.modules]}))
+"""
+
+
+def run_once(module):
+    env = dict(os.environ, MODEL_WARMUP="false")
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE, module, json.dumps(DEFERRED_MODULES)],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        return {"error": completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "import failed"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail when importing the app exceeds the startup-time budget.")
+    parser.add_argument("--module", default="app", help="Module a worker imports on boot")
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET_SECONDS, help="Allowed median import time (seconds)")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters to take the median over")
+    args = parser.parse_args()
+
+    runs = [run_once(args.module) for _ in range(args.repeat)]
+    errors = [run["error"] for run in runs if "error" in run]
+    report = {"module": args.module, "budget_seconds": args.budget, "runs": len(runs)}
+    if errors:
+        report["error"] = errors[0]
+        report["passed"] = False
+    else:
+        report["median_import_seconds"] = round(statistics.median(run["import_seconds"] for run in runs), 3)
+        report["eagerly_loaded"] = sorted({m for run in runs for m in run["loaded"]})
+        report["passed"] = report["median_import_seconds"] <= args.budget and not report["eagerly_loaded"]
+
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# =====================================
+# Benchmark: iterrows vs Vectorized XLSX Serialization
+# =====================================
+# Compares the old `.xlsx` branch of read_latest_documents_from_blob
+# (pd.read_excel + DataFrame.iterrows + string concatenation) with
+# core.document_reader.serialize_workbook on the demo workbooks, with their
+# data rows repeated --scale times to mimic large balance sheets.
+# Reports the total time, the formatting time alone (workbook already loaded)
+# and whether both produce identical text.
+#
+# The demo workbooks live in Data/demo_docs/<good_company|bad_company>/ at the
+# repository root (one level above new-credit-risk); --source is searched recursively.
+#
+# Usage (from the new-credit-risk folder):
+#   python benchmarks/xlsx_serializer_benchmark.py --scale 100
+#   python benchmarks/xlsx_serializer_benchmark.py --source ../Data/demo_docs/good_company
+
+import io
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import openpyxl
+import pandas as pd
+
+# Make the project root importable when run as a script
+PROJECT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, PROJECT_ROOT)
+
+DEMO_DOCS = os.path.normpath(os.path.join(PROJECT_ROOT, "..", "Data", "demo_docs"))
+
+from core.document_reader import serialize_sheet, serialize_workbook
+
+
+def legacy_serialize(data):
+    """The previous implementation: first sheet only, one iterrows Series per row."""
+    df = pd.read_excel(io.BytesIO(data), engine='openpyxl')
+    content = ""
+    for i, row in df.iterrows():
+        labeled_row = ", ".join(f"{col.strip()}: {str(row[col]).strip()}" for col in df.columns)
+        content += labeled_row + "\n"
+    return content
+
+
+def legacy_format(df):
+    content = ""
+    for i, row in df.iterrows():
+        labeled_row = ", ".join(f"{col.strip()}: {str(row[col]).strip()}" for col in df.columns)
+        content += labeled_row + "\n"
+    return content
+
+
+def scale_workbook(path, scale):
+    """Returns the workbook bytes with every sheet's data rows (all but the header) repeated `scale` times."""
+    source = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    target = openpyxl.Workbook(write_only=True)
+    for sheet in source.worksheets:
+        rows = [list(row) for row in sheet.iter_rows(values_only=True)]
+        out = target.create_sheet(sheet.title)
+        if not rows:
+            continue
+        out.append(rows[0])
+        for _ in range(scale):
+            for row in rows[1:]:
+                out.append(row)
+    source.close()
+    buffer = io.BytesIO()
+    target.save(buffer)
+    return buffer.getvalue()
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare iterrows and vectorized XLSX-to-text conversion.")
+    parser.add_argument("--source", default=DEMO_DOCS, help="Folder searched (recursively) for .xlsx workbooks")
+    parser.add_argument("--scale", type=int, default=100, help="Repeat each sheet's data rows this many times")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.source, "**", "*.xlsx"), recursive=True))
+    if not paths:
+        raise SystemExit(f"No .xlsx files found in {args.source}")
+
+    results = {}
+    for path in paths:
+        data = scale_workbook(path, args.scale)
+        df = pd.read_excel(io.BytesIO(data), engine='openpyxl')
+
+        old_text, old_total = timed(legacy_serialize, data)
+        new_text, new_total = timed(serialize_workbook, data)
+        _, old_format = timed(legacy_format, df)
+        _, new_format = timed(serialize_sheet, df)
+
+        single_sheet = len(openpyxl.load_workbook(io.BytesIO(data), read_only=True).sheetnames) == 1
+        results[os.path.relpath(path, args.source)] = {
+            "rows": len(df),
+            "cells": int(df.size),
+            "iterrows_total_seconds": round(old_total, 3),
+            "vectorized_total_seconds": round(new_total, 3),
+            "total_speedup": round(old_total / new_total, 2),
+            "iterrows_format_seconds": round(old_format, 4),
+            "vectorized_format_seconds": round(new_format, 4),
+            "format_speedup": round(old_format / new_format, 1),
+            "identical_output": old_text == new_text if single_sheet else "n/a (multi-sheet)",
+        }
+
+    print(json.dumps({"source": args.source, "scale": args.scale, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,10 @@ from core.credit_pipeline import credit_scoring_pipeline             # Credit sc
 from core.fraud_pipeline import fraud_detection_pipeline             # Fraud detection agent
 from core.compliance_pipeline import compliance_agent_pipeline       # Compliance validation agent
 from core.explainability_pipeline import explainability_agent_pipeline  # SHAP/LLM explanation agent
+from core.credit_pipeline import credit_scoring_pipeline_async             # Async variants (awaitable)
+from core.fraud_pipeline import fraud_detection_pipeline_async
+from core.compliance_pipeline import compliance_agent_pipeline_async
+from core.explainability_pipeline import explainability_agent_pipeline_async
 
 # =====================================
 # Agent Registry Dictionary
@@ -30,4 +34,14 @@ AGENT_PIPELINES = {
     "compliance": compliance_agent_pipeline,
     "explainability": explainability_agent_pipeline,
 }
+
+# Async counterparts built on the async Azure AI Projects client.
+# Can be used like: `await AGENT_PIPELINES_ASYNC["fraud"](summary_text)`
+
+AGENT_PIPELINES_ASYNC = {
+    "credit": credit_scoring_pipeline_async,
+    "fraud": fraud_detection_pipeline_async,
+    "compliance": compliance_agent_pipeline_async,
+    "explainability": explainability_agent_pipeline_async,
+}
 # =====================================
\ No newline at end of file
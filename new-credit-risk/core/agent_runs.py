@@ -0,0 +1,182 @@
+# =====================================
+# Azure AI Agent Thread Runs
+# =====================================
+# Shared helpers for the request/response pattern every pipeline uses:
+# create a thread, post the messages, stream the run and take the assistant
+# reply from the completion events (no status polling or sleep loops; the
+# newest message is fetched only if the stream did not carry it).
+# `run_agent` uses the shared sync client and
+# `run_agent_async` the async client, so an event loop can overlap many runs
+# without tying up a thread per call. Replies are served from the LLM response
+# cache when the same request was answered before.
+# Like core.azure_clients, the agents SDK models are imported on first use
+# (see _models), so importing the pipelines does not load the Azure SDKs.
+
+from core.azure_clients import (
+    get_project_client, get_agent,               # Shared sync client & agent handles
+    get_async_project_client, get_agent_async    # Shared async client & agent handles
+)
+from core.llm_cache import LLM_CACHE_ENABLED, get_llm_cache, make_key, model_tag  # Content-addressed reply cache
+
+# =====================================
+# Message Helpers
+# =====================================
+
+def _models():
+    """
+    Returns azure.ai.agents.models, imported on first use. Provides ListSortOrder
+    (newest-first listing), MessageStreamEvent / AgentStreamEvent (completion and error
+    events), RunStatus (terminal run states) and ThreadMessage / ThreadRun (event payloads).
+    """
+    from azure.ai.agents import models
+    return models
+
+
+def _as_messages(messages) -> list:
+    """Accepts a single user prompt or a list of (role, content) pairs."""
+    if isinstance(messages, str):
+        return [("user", messages)]
+    return list(messages)
+
+
+def _reply_text(message) -> str:
+    """Joins the text parts of an agent message."""
+    return "\n".join(part.text.value for part in message.text_messages)
+
+
+def _latest_assistant_text(messages) -> str:
+    """Returns the text of the newest assistant message in a newest-first listing, or None."""
+    for message in messages:
+        if message.role == "assistant" and message.text_messages:
+            return _reply_text(message)
+    return None
+
+
+def _cache_key(agent, messages: list, instructions: str):
+    """Returns the reply cache key for a request, or None when caching is off."""
+    if not LLM_CACHE_ENABLED:
+        return None
+    return make_key(agent.id, model_tag(agent), messages, instructions)
+
+# =====================================
+# Run Stream Handling
+# =====================================
+
+def _new_stream_state() -> dict:
+    return {"run": None, "reply": None, "error": None}
+
+
+def _on_stream_event(state: dict, event_type, event_data):
+    """Records the latest run status and the newest completed assistant message."""
+    models = _models()
+    if isinstance(event_data, models.ThreadRun):
+        state["run"] = event_data
+    elif (event_type == models.MessageStreamEvent.THREAD_MESSAGE_COMPLETED
+          and isinstance(event_data, models.ThreadMessage)
+          and event_data.role == "assistant" and event_data.text_messages):
+        state["reply"] = _reply_text(event_data)
+    elif event_type == models.AgentStreamEvent.ERROR:
+        state["error"] = event_data
+
+
+def _run_completed(agent_id: str, state: dict) -> bool:
+    """Checks the final run status reported by the stream."""
+    run = state["run"]
+    if run is not None and run.status == _models().RunStatus.COMPLETED:
+        return True
+    status = run.status if run is not None else "unknown"
+    reason = state["error"] or (run.last_error if run is not None else None)
+    print(f"Agent {agent_id} run ended with status {status}: {reason}")
+    return False
+
+# =====================================
+# Sync Run
+# =====================================
+
+def run_agent(agent_id: str, messages, instructions: str = None, use_cache: bool = True) -> str:
+    """
+    Sends messages to an Azure AI agent on a new thread and returns its reply.
+
+    Parameters:
+    - agent_id (str): Azure AI agent ID.
+    - messages (str | list): A user prompt, or (role, content) pairs posted in order.
+    - instructions (str): Optional run-level instructions overriding the agent's.
+    - use_cache (bool): Serve/store the reply in the LLM response cache.
+
+    Returns:
+    - str: Text of the latest assistant message ("" if the run failed or the agent did not reply).
+    """
+    project = get_project_client()
+    agent = get_agent(agent_id)
+    messages = _as_messages(messages)
+
+    # A cache hit skips the thread/run round trips entirely
+    key = _cache_key(agent, messages, instructions) if use_cache else None
+    if key is not None:
+        cached = get_llm_cache().get(key)
+        if cached is not None:
+            return cached
+
+    thread = project.agents.threads.create()
+    for role, content in messages:
+        project.agents.messages.create(thread_id=thread.id, role=role, content=content)
+
+    # The stream ends when the run reaches a terminal state
+    state = _new_stream_state()
+    with project.agents.runs.stream(thread_id=thread.id, agent_id=agent.id, instructions=instructions) as stream:
+        for event_type, event_data, _ in stream:
+            _on_stream_event(state, event_type, event_data)
+    if not _run_completed(agent_id, state):
+        return ""
+
+    reply = state["reply"]
+    if reply is None:
+        # Only the newest message of this run is needed
+        reply = _latest_assistant_text(project.agents.messages.list(
+            thread_id=thread.id, run_id=state["run"].id, order=_models().ListSortOrder.DESCENDING, limit=1
+        ))
+    if key is not None and reply:
+        get_llm_cache().set(key, agent.id, reply)
+    return reply or ""
+
+# =====================================
+# Async Run
+# =====================================
+
+async def run_agent_async(agent_id: str, messages, instructions: str = None, use_cache: bool = True) -> str:
+    """Async version of run_agent built on the async Azure AI Projects client."""
+    project = get_async_project_client()
+    agent = await get_agent_async(agent_id)
+    messages = _as_messages(messages)
+
+    # Cache lookups are local SQLite reads, cheap enough to run on the loop
+    key = _cache_key(agent, messages, instructions) if use_cache else None
+    if key is not None:
+        cached = get_llm_cache().get(key)
+        if cached is not None:
+            return cached
+
+    thread = await project.agents.threads.create()
+    for role, content in messages:
+        await project.agents.messages.create(thread_id=thread.id, role=role, content=content)
+
+    state = _new_stream_state()
+    async with await project.agents.runs.stream(
+        thread_id=thread.id, agent_id=agent.id, instructions=instructions
+    ) as stream:
+        async for event_type, event_data, _ in stream:
+            _on_stream_event(state, event_type, event_data)
+    if not _run_completed(agent_id, state):
+        return ""
+
+    reply = state["reply"]
+    if reply is None:
+        listed = [
+            message async for message in project.agents.messages.list(
+                thread_id=thread.id, run_id=state["run"].id, order=_models().ListSortOrder.DESCENDING, limit=1
+            )
+        ]
+        reply = _latest_assistant_text(listed)
+    if key is not None and reply:
+        get_llm_cache().set(key, agent.id, reply)
+    return reply or ""
@@ -0,0 +1,248 @@
+# =====================================
+# Analysis Context Store
+# =====================================
+# Keeps the bureau summary (and the agent results built on it) of each analysis
+# in memory, keyed by an analysis ID returned by /run-bureau. The fraud,
+# compliance and explainability endpoints look the summary up by ID instead of
+# re-reading the single global output_data/rag_summary.txt, so concurrent users
+# analysing different companies no longer see each other's summaries and no
+# request pays file I/O.
+# The store is an LRU bounded by ANALYSIS_STORE_MAX_ENTRIES. With
+# ANALYSIS_SPILL_DIR set, every context is also written through to that folder
+# as JSON when it is created or gets a result, and a lookup that misses memory
+# loads it from there. Pointing all workers at one folder therefore lets any
+# worker serve an analysis another worker created; evicted contexts are not lost.
+
+import os                   # Store limits and spill folder from the environment
+import json                 # Spill file format
+import time                 # Context timestamps for the TTL
+import uuid                 # Analysis IDs
+import threading            # Guards the shared LRU
+from collections import OrderedDict  # LRU order (oldest first)
+from contextlib import contextmanager  # Spill folder lock
+from datetime import datetime, timezone  # Timestamps in context records
+
+try:
+    import fcntl            # Cross-process file lock (POSIX)
+except ImportError:         # Windows: fall back to in-process locking only
+    fcntl = None
+
+# =====================================
+# Configuration
+# =====================================
+
+ANALYSIS_STORE_MAX_ENTRIES = int(os.getenv("ANALYSIS_STORE_MAX_ENTRIES", "256"))  # Contexts kept in memory
+ANALYSIS_TTL_SECONDS = int(os.getenv("ANALYSIS_TTL_SECONDS", "86400"))            # Contexts expire after 1 day
+ANALYSIS_SPILL_DIR = os.getenv("ANALYSIS_SPILL_DIR", "")                          # "" = memory only (per process)
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+# =====================================
+# Store
+# =====================================
+
+class AnalysisStore:
+    """
+    In-memory LRU of analysis contexts with an optional write-through folder.
+
+    Parameters:
+    - max_entries (int): Contexts kept in memory; the least recently used is evicted beyond this.
+    - ttl_seconds (int): Age after which a context counts as unknown (0 = never expires).
+    - spill_dir (str): Folder every context is written to and looked up in on a miss, shared
+      by all workers that use it ("" or None keeps contexts in this process only).
+    """
+
+    def __init__(self, max_entries: int = ANALYSIS_STORE_MAX_ENTRIES, ttl_seconds: int = ANALYSIS_TTL_SECONDS,
+                 spill_dir: str = ANALYSIS_SPILL_DIR):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.spill_dir = spill_dir or None
+        self._contexts = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"created": 0, "hits": 0, "misses": 0, "evicted": 0, "spilled": 0, "restored": 0}
+        if self.spill_dir:
+            os.makedirs(self.spill_dir, exist_ok=True)
+
+    # -------------------------------------
+    # Public API
+    # -------------------------------------
+    def create(self, summary: str, bureau: dict = None, company: str = None) -> str:
+        """
+        Stores a new analysis context and returns its ID.
+
+        Parameters:
+        - summary (str): Bureau summary the downstream agents analyse.
+        - bureau (dict): Full bureau pipeline result.
+        - company (str): Company the summary belongs to.
+
+        Returns:
+        - str: New analysis ID.
+        """
+        analysis_id = uuid.uuid4().hex
+        context = {
+            "analysis_id": analysis_id,
+            "company": company,
+            "summary": summary,
+            "bureau": bureau,
+            "results": {},
+            "created_at": _utc_now(),
+            "_created": time.time(),
+        }
+        with self._lock:
+            if self.spill_dir:
+                with self._file_lock():
+                    self._spill(analysis_id, context)
+                self._prune_spill()
+            self._contexts[analysis_id] = context
+            self._counters["created"] += 1
+            self._evict()
+        return analysis_id
+
+    def get(self, analysis_id: str):
+        """Returns a copy of the context (without internal fields), or None if it is unknown or expired."""
+        with self._lock:
+            context = self._lookup(analysis_id, refresh=True)
+            if context is None:
+                return None
+            return {k: v for k, v in context.items() if not k.startswith("_")}
+
+    def get_summary(self, analysis_id: str):
+        """Returns the bureau summary of an analysis, or None if it is unknown or expired."""
+        with self._lock:
+            context = self._lookup(analysis_id)
+            return None if context is None else context["summary"]
+
+    def add_result(self, analysis_id: str, agent: str, result) -> bool:
+        """Records an agent's result on the analysis; returns False if the analysis is unknown."""
+        with self._lock:
+            if not self.spill_dir:
+                context = self._lookup(analysis_id)
+                if context is None:
+                    return False
+                context["results"][agent] = result
+                return True
+            # Merge into the shared file, so results recorded by other workers are kept
+            with self._file_lock():
+                context = self._lookup(analysis_id, refresh=True)
+                if context is None:
+                    return False
+                context["results"][agent] = result
+                self._spill(analysis_id, context)
+            return True
+
+    def stats(self) -> dict:
+        """Reports the number of contexts in memory and on disk plus hit/miss/eviction counters."""
+        with self._lock:
+            return {
+                "in_memory": len(self._contexts),
+                "max_entries": self.max_entries,
+                "spilled_on_disk": len(self._spill_files()) if self.spill_dir else 0,
+                "spill_enabled": self.spill_dir is not None,
+                **self._counters,
+            }
+
+    # -------------------------------------
+    # Internal Helpers (call with lock held)
+    # -------------------------------------
+    def _expired(self, context: dict) -> bool:
+        return bool(self.ttl_seconds) and time.time() - context["_created"] > self.ttl_seconds
+
+    def _lookup(self, analysis_id: str, refresh: bool = False):
+        """
+        Finds a context in memory (or loads it from the spill folder) and marks it recently used.
+        With `refresh`, a context in memory is re-read from the spill folder, picking up results
+        other workers recorded.
+        """
+        context = self._contexts.get(analysis_id)
+        if context is None or (refresh and self.spill_dir):
+            context = self._restore(analysis_id) or context
+        if context is not None and self._expired(context):
+            self._contexts.pop(analysis_id, None)
+            context = None
+        if context is None:
+            self._counters["misses"] += 1
+            return None
+        self._contexts.move_to_end(analysis_id)
+        self._counters["hits"] += 1
+        return context
+
+    def _evict(self):
+        """Drops the least recently used contexts beyond max_entries (they stay in the spill folder)."""
+        while len(self._contexts) > self.max_entries:
+            self._contexts.popitem(last=False)
+            self._counters["evicted"] += 1
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock on the spill folder, held while a context file is read and rewritten."""
+        with open(os.path.join(self.spill_dir, ".lock"), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _spill_path(self, analysis_id: str) -> str:
+        return os.path.join(self.spill_dir, f"{analysis_id}.json")
+
+    def _spill_files(self) -> list:
+        return [name for name in os.listdir(self.spill_dir) if name.endswith(".json")]
+
+    def _spill(self, analysis_id: str, context: dict):
+        path = self._spill_path(analysis_id)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(context, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)  # Atomic: readers never see a partial file
+        self._counters["spilled"] += 1
+
+    def _restore(self, analysis_id: str):
+        """Loads a context from the spill folder into memory; returns None if there is none (or it expired)."""
+        if not self.spill_dir or not analysis_id or not analysis_id.isalnum():  # IDs are hex; no path tricks
+            return None
+        path = self._spill_path(analysis_id)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                context = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if self._expired(context):
+            return None
+        self._contexts[analysis_id] = context
+        self._counters["restored"] += 1
+        self._evict()
+        return context
+
+    def _prune_spill(self):
+        """Deletes spill files older than the TTL."""
+        if not self.ttl_seconds:
+            return
+        cutoff = time.time() - self.ttl_seconds
+        for name in self._spill_files():
+            path = os.path.join(self.spill_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+
+# =====================================
+# Shared Instance
+# =====================================
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_analysis_store() -> AnalysisStore:
+    """Returns the process-wide analysis context store."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = AnalysisStore()
+        return _store
@@ -0,0 +1,243 @@
+# =====================================
+# Shared Azure AI Project Clients
+# =====================================
+# Process-wide registry for Azure AI Project clients and agent handles.
+# Pipelines used to build a new AIProjectClient(DefaultAzureCredential()) and call
+# project.agents.get_agent(...) on every request, paying a token fetch and an extra
+# HTTP GET before any real work. This module creates one client per endpoint,
+# caches agent handles by ID and shares one token cache that refreshes ahead of expiry.
+# The Azure SDKs themselves (~1.5 s to import) are imported on first use, so importing
+# a pipeline never touches azure.identity / azure.ai.projects or the network.
+
+import os                   # Endpoint override from the environment
+import time                 # Token expiry checks
+import asyncio              # Per-event-loop registries for the async clients
+import weakref              # Drops async registries together with their event loop
+import threading            # Guards the shared caches
+
+# =====================================
+# Project Endpoint & Agent IDs
+# =====================================
+
+PROJECT_ENDPOINT = os.getenv(
+    "AZURE_AI_PROJECT_ENDPOINT",
+    "https://akshitasurya.services.ai.azure.com/api/projects/CreditRiskAssessor"
+)
+
+CREDIT_SCORING_AGENT_ID = "asst_OPFiIidA5lUgry5IBnze5eKd"   # Credit scoring agent
+FRAUD_AGENT_ID = "asst_jma5gWHJMxPQt271vldw4mwg"            # Fraud narrative agent
+COMPLIANCE_AGENT_ID = "asst_jma5gWHJMxPQt271vldw4mwg"       # Legal compliance agent
+EXPLAINABILITY_AGENT_ID = "asst_oDWcHiwhp6UWnWCUCHs892Bb"   # SHAP explanation agent
+CONTROLLER_AGENT_ID = "asst_yv7fmqGQwS0xSBs4uE7D6zIO"       # Smart pipeline controller agent
+
+# Refresh cached tokens this many seconds before they expire
+TOKEN_REFRESH_MARGIN_SECONDS = int(os.getenv("AZURE_TOKEN_REFRESH_MARGIN_SECONDS", "300"))
+
+# =====================================
+# Token Caching Credential
+# =====================================
+
+class RefreshingTokenCredential:
+    """
+    Wraps a TokenCredential and shares its tokens across every client in the process.
+
+    Tokens are cached per scope. Once a cached token is within `refresh_margin` seconds
+    of expiry, callers keep getting it while one background thread fetches its successor,
+    so requests only wait on the credential for the first token of a scope or after a
+    token has actually expired. If the background refresh fails, the cached token stays
+    in use and the next call retries.
+    """
+
+    def __init__(self, credential, refresh_margin: int = TOKEN_REFRESH_MARGIN_SECONDS):
+        self._credential = credential
+        self._refresh_margin = refresh_margin
+        self._tokens = {}
+        self._refreshing = set()  # Scopes with a background refresh in flight
+        self._lock = threading.Lock()
+
+    def get_token(self, *scopes, claims=None, tenant_id=None, **kwargs):
+        # Claims challenges (e.g. CAE) must always go to the underlying credential
+        if claims:
+            return self._credential.get_token(*scopes, claims=claims, tenant_id=tenant_id, **kwargs)
+
+        key = (scopes, tenant_id)
+        with self._lock:
+            token = self._tokens.get(key)
+            now = time.time()
+            if token is None or token.expires_on <= now:
+                # Nothing usable cached: this caller has to wait for the credential
+                token = self._credential.get_token(*scopes, tenant_id=tenant_id, **kwargs)
+                self._tokens[key] = token
+            elif token.expires_on - now <= self._refresh_margin and key not in self._refreshing:
+                self._refreshing.add(key)
+                threading.Thread(
+                    target=self._refresh, args=(key, kwargs), name="token-refresh", daemon=True
+                ).start()
+            return token
+
+    def _refresh(self, key, kwargs):
+        """Fetches a new token for `key` off the request path."""
+        scopes, tenant_id = key
+        try:
+            token = self._credential.get_token(*scopes, tenant_id=tenant_id, **kwargs)
+            with self._lock:
+                self._tokens[key] = token
+        except Exception:
+            pass  # The cached token is still valid; the next call starts another refresh
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def close(self):
+        self._credential.close()
+
+
+# =====================================
+# Client & Agent Registry
+# =====================================
+
+_lock = threading.Lock()
+_credential = None
+_clients = {}   # endpoint -> AIProjectClient
+_agents = {}    # (endpoint, agent_id) -> agent handle
+
+
+def get_credential() -> RefreshingTokenCredential:
+    """Returns the process-wide credential (created on first use)."""
+    global _credential
+    with _lock:
+        if _credential is None:
+            from azure.identity import DefaultAzureCredential  # Azure credential chain
+            _credential = RefreshingTokenCredential(DefaultAzureCredential())
+        return _credential
+
+
+def get_project_client(endpoint: str = PROJECT_ENDPOINT):
+    """
+    Returns the shared AIProjectClient for an endpoint, creating it on first use.
+
+    Parameters:
+    - endpoint (str): Azure AI Project endpoint URL.
+
+    Returns:
+    - AIProjectClient: Client reused by every pipeline in this process.
+    """
+    credential = get_credential()
+    with _lock:
+        client = _clients.get(endpoint)
+        if client is None:
+            from azure.ai.projects import AIProjectClient  # Azure AI Project client
+            client = AIProjectClient(credential=credential, endpoint=endpoint)
+            _clients[endpoint] = client
+        return client
+
+
+def get_agent(agent_id: str, endpoint: str = PROJECT_ENDPOINT):
+    """
+    Returns the agent handle for `agent_id`, fetching it from Azure only the first time.
+
+    Parameters:
+    - agent_id (str): Azure AI agent (assistant) ID.
+    - endpoint (str): Azure AI Project endpoint URL.
+
+    Returns:
+    - Agent: Cached agent handle (use `.id` for thread runs).
+    """
+    key = (endpoint, agent_id)
+    with _lock:
+        agent = _agents.get(key)
+    if agent is None:
+        agent = get_project_client(endpoint).agents.get_agent(agent_id)
+        with _lock:
+            agent = _agents.setdefault(key, agent)
+    return agent
+
+
+# =====================================
+# Async Clients
+# =====================================
+# Async clients and credentials are bound to the event loop they are first used on,
+# so the async registry keeps one credential, client set and agent cache per loop.
+# With the long-lived SK event loop this means one set per process.
+
+class AsyncRefreshingTokenCredential:
+    """Async counterpart of RefreshingTokenCredential for the aio clients (refreshes run as event loop tasks)."""
+
+    def __init__(self, credential, refresh_margin: int = TOKEN_REFRESH_MARGIN_SECONDS):
+        self._credential = credential
+        self._refresh_margin = refresh_margin
+        self._tokens = {}
+        self._refreshing = {}  # Scope -> background refresh task in flight
+        self._lock = asyncio.Lock()
+
+    async def get_token(self, *scopes, claims=None, tenant_id=None, **kwargs):
+        if claims:
+            return await self._credential.get_token(*scopes, claims=claims, tenant_id=tenant_id, **kwargs)
+
+        key = (scopes, tenant_id)
+        async with self._lock:
+            token = self._tokens.get(key)
+            now = time.time()
+            if token is None or token.expires_on <= now:
+                token = await self._credential.get_token(*scopes, tenant_id=tenant_id, **kwargs)
+                self._tokens[key] = token
+            elif token.expires_on - now <= self._refresh_margin and key not in self._refreshing:
+                self._refreshing[key] = asyncio.ensure_future(self._refresh(key, kwargs))
+            return token
+
+    async def _refresh(self, key, kwargs):
+        """Fetches a new token for `key` without holding up the caller that triggered it."""
+        scopes, tenant_id = key
+        try:
+            self._tokens[key] = await self._credential.get_token(*scopes, tenant_id=tenant_id, **kwargs)
+        except Exception:
+            pass  # The cached token is still valid; the next call starts another refresh
+        finally:
+            self._refreshing.pop(key, None)
+
+    async def close(self):
+        for task in list(self._refreshing.values()):
+            task.cancel()
+        await self._credential.close()
+
+
+_async_registries = weakref.WeakKeyDictionary()  # event loop -> {"credential", "clients", "agents"}
+
+
+def _async_registry() -> dict:
+    loop = asyncio.get_running_loop()
+    with _lock:
+        registry = _async_registries.get(loop)
+        if registry is None:
+            from azure.identity.aio import DefaultAzureCredential as AsyncDefaultAzureCredential  # Async credential chain
+            registry = {
+                "credential": AsyncRefreshingTokenCredential(AsyncDefaultAzureCredential()),
+                "clients": {},
+                "agents": {},
+            }
+            _async_registries[loop] = registry
+        return registry
+
+
+def get_async_project_client(endpoint: str = PROJECT_ENDPOINT):
+    """
+    Returns the shared async AIProjectClient for an endpoint on the running event loop.
+    Must be called from inside a coroutine.
+    """
+    registry = _async_registry()
+    client = registry["clients"].get(endpoint)
+    if client is None:
+        from azure.ai.projects.aio import AIProjectClient as AsyncAIProjectClient  # Async Azure AI Project client
+        client = AsyncAIProjectClient(credential=registry["credential"], endpoint=endpoint)
+        registry["clients"][endpoint] = client
+    return client
+
+
+async def get_agent_async(agent_id: str, endpoint: str = PROJECT_ENDPOINT):
+    """Async version of get_agent: fetches the agent handle once per event loop and caches it."""
+    registry = _async_registry()
+    agent = registry["agents"].get((endpoint, agent_id))
+    if agent is None:
+        agent = await get_async_project_client(endpoint).agents.get_agent(agent_id)
+        registry["agents"][(endpoint, agent_id)] = agent
+    return agent
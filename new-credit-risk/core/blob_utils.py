@@ -2,8 +2,8 @@
 # Azure Blob Upload Utility
 # =====================================
 
-from azure.storage.blob import BlobServiceClient
 import os
+import threading
 from dotenv import load_dotenv
 
 # =====================================
@@ -28,32 +28,52 @@ connection_string = (
     "EndpointSuffix=core.windows.net"
 )
 
+# The container client is created on the first upload (not at import), so the app
+# starts even when storage settings are missing or Azure is unreachable
+_container_client = None
+_client_lock = threading.Lock()
 
 
-# Initialize the BlobServiceClient and get a container client for use across uploads
-blob_service_client = BlobServiceClient.from_connection_string(connection_string)
-container_client = blob_service_client.get_container_client(container_name)
+def get_container_client():
+    """Returns the shared container client used across uploads, creating it on first use."""
+    global _container_client
+    with _client_lock:
+        if _container_client is None:
+            from azure.storage.blob import BlobServiceClient  # Deferred: only needed once something is uploaded
+            blob_service_client = BlobServiceClient.from_connection_string(connection_string)
+            _container_client = blob_service_client.get_container_client(container_name)
+        return _container_client
+
+
+def company_blob_name(company: str, file_name: str) -> str:
+    """Returns the per-company blob name, e.g. ("NovaSynth", "q1.xlsx") -> "novasynth/q1.xlsx"."""
+    return f"{company.strip().lower()}/{file_name}"
 
 # =====================================
 # Upload Function
 # =====================================
 
-def upload_file_to_blob(file_obj, blob_name: str):
+def upload_file_to_blob(file_obj, blob_name: str, company: str = None):
     """
     Uploads a file-like object to Azure Blob Storage.
 
     Parameters:
     - file_obj: An object with a `.stream` attribute (e.g., Flask FileStorage or BytesIO).
     - blob_name (str): The name under which the file should be stored in the blob container.
+    - company (str): Optional company; the blob is stored as `<company>/<blob_name>`.
 
     Returns:
     - str: Success message indicating the blob name uploaded.
     
     Behavior:
     - Overwrites any existing blob with the same name.
+    - With a company, stores the blob under `<company>/`, the prefix the bureau pipeline lists per company.
     - Suitable for real-time document uploads via web forms or pipelines.
     """
+    if company:
+        blob_name = company_blob_name(company, blob_name)
+
     # Upload the file stream to the specified blob
-    container_client.upload_blob(name=blob_name, data=file_obj.stream, overwrite=True)
+    get_container_client().upload_blob(name=blob_name, data=file_obj.stream, overwrite=True)
     
     return f"Uploaded to blob: {blob_name}"
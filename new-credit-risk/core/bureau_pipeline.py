@@ -1,23 +1,15 @@
 import os
-import io
 import re
 import json
 import uuid
-import pandas as pd
 from datetime import datetime, timezone
-from docx import Document
-from sentence_transformers import SentenceTransformer
-import requests
-
-from azure.identity import DefaultAzureCredential
-from azure.ai.projects import AIProjectClient
-from azure.ai.agents.models import ListSortOrder
-from azure.storage.blob import BlobServiceClient
-from azure.search.documents import SearchClient
-from azure.core.credentials import AzureKeyCredential
 
 import os
 from dotenv import load_dotenv
+from core.ingest_manifest import IngestManifest, content_hash, diff_chunks
+from core.embeddings import embed_texts_cached
+from core.search_backends import get_search_backend
+from core.document_reader import read_documents
 
 # Load environment variables from .env file in the root directory
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '.env'))
@@ -35,184 +27,175 @@ AZURE_SEARCH_KEY = os.getenv("BEAURAU-API-KEY")
 INDEX_NAME = os.getenv("BEAURAU-INDEX-NAME")
 QUERY_TEXT = "What are the total assets and liabilities for the company?"
 
-# === Init Model + SearchClient ===
-embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
-search_client = SearchClient(
-    endpoint=AZURE_SEARCH_ENDPOINT,
-    index_name=INDEX_NAME,
-    credential=AzureKeyCredential(AZURE_SEARCH_KEY)
-)
+# === Embedding Model + Search Backend ===
+# Both are created on first use and shared process-wide: embed_texts_cached(None, ...) uses
+# core.embeddings.get_embedding_model(), which loads the SentenceTransformer once (and only
+# for texts missing from the embedding cache); get_search_backend() returns Azure AI Search
+# or the local vector index (VECTOR_BACKEND)
+
+# Records indexed blobs and chunk hashes so re-runs only touch what changed. The
+# records are kept per search target, so a backend or index switch re-indexes
+_ingest_manifests = {}
+
+def get_ingest_manifest():
+    """Returns the ingest manifest of the current search backend's target"""
+    target = get_search_backend().target
+    if target not in _ingest_manifests:
+        _ingest_manifests[target] = IngestManifest(target)
+    return _ingest_manifests[target]
 
 # === Step 1: Blob Reader ===
-def read_latest_documents_from_blob(container_name, num_docs=4):
-    blob_service_client = BlobServiceClient.from_connection_string(connection_string)
-    container_client = blob_service_client.get_container_client(container_name)
-    blobs = sorted(container_client.list_blobs(), key=lambda b: b.last_modified, reverse=True)[:num_docs]
+def get_container_client(container_name):
+    """Returns a container client for the bureau storage account (the Blob SDK is imported on first use)"""
+    from azure.storage.blob import BlobServiceClient
+    return BlobServiceClient.from_connection_string(connection_string).get_container_client(container_name)
 
-    contents = []
-    for blob in blobs:
-        blob_data = container_client.download_blob(blob.name).readall()
-        name = blob.name.lower()
-        try:
-            if name.endswith(".docx"):
-                doc = Document(io.BytesIO(blob_data))
-                content = "\n".join(p.text for p in doc.paragraphs if p.text.strip())
-            elif name.endswith(".xlsx"):
-                df = pd.read_excel(io.BytesIO(blob_data), engine='openpyxl')
-                content = ""
-                for i, row in df.iterrows():
-                    labeled_row = ", ".join(f"{col.strip()}: {str(row[col]).strip()}" for col in df.columns)
-                    content += labeled_row + "\n"
-            else:
-                content = ""
-        except Exception as e:
-            content = f"Error reading {blob.name}: {e}"
-        contents.append(f"--- File: {blob.name} ---\n{content}")
+def list_latest_blobs(container_name, num_docs=4, company=None):
+    """Returns the container client and the `num_docs` most recently modified blobs (optionally of one company).
+    With `company`, only that company's prefix (`<company>/`) is listed, so the listing and the
+    sort cover that company's documents instead of the whole container."""
+    container_client = get_container_client(container_name)
+    prefix = f"{company.lower()}/" if company else None
+    blobs = sorted(container_client.list_blobs(name_starts_with=prefix), key=lambda b: b.last_modified, reverse=True)[:num_docs]
+    return container_client, blobs
+
+def read_latest_documents_from_blob(container_name, num_docs=4, blob_hashes=None, company=None):
+    """Downloads and parses the latest blobs; fills `blob_hashes` with name -> {etag, sha256} if given.
+    Downloads run in parallel and .docx/.xlsx files are parsed in a process pool; the
+    sections keep the newest-first blob order."""
+    container_client, blobs = list_latest_blobs(container_name, num_docs, company)
+    contents = read_documents(
+        container_client,
+        [blob.name for blob in blobs],
+        blob_hashes=blob_hashes,
+        etags={blob.name: blob.etag for blob in blobs},
+    )
     return "\n".join(contents)
 
 # === Step 2: Index into Azure Search ===
+def detect_company(text):
+    """Detect which company a document set belongs to"""
+    text_lower = text.lower()
+    if "novasynth" in text_lower or "nova synth" in text_lower:
+        return "novasynth"
+    if "terradrive" in text_lower or "terra drive" in text_lower:
+        return "terradrive"
+    print(f"DEBUG: Could not detect company from text preview: {text_lower[:100]}...")
+    return "novasynth"  # Default to novasynth
+
 def index_to_azure_search(text, company_identifier=None):
-    """Index text with proper company-prefixed IDs"""
+    """Index text with proper company-prefixed IDs, writing only new/changed chunks"""
     
     # Detect company from the text if not provided
     if not company_identifier:
-        text_lower = text.lower()
-        if "novasynth" in text_lower or "nova synth" in text_lower:
-            company_identifier = "novasynth"
-        elif "terradrive" in text_lower or "terra drive" in text_lower:
-            company_identifier = "terradrive"
-        else:
-            print(f"DEBUG: Could not detect company from text preview: {text_lower[:100]}...")
-            company_identifier = "novasynth"  # Default to novasynth
+        company_identifier = detect_company(text)
     
     print(f"DEBUG: Detected company identifier: {company_identifier}")
     
-    # Clear existing documents for this company first
-    clear_company_documents(company_identifier)
-    
     chunks = [text[i:i+1000] for i in range(0, len(text), 1000)]
-    documents = []
+    # Use predictable IDs: novasynth_0001, novasynth_0002, etc.
+    chunk_ids = [f"{company_identifier}_{i:04d}" for i in range(len(chunks))]
+    chunk_hashes = {chunk_id: content_hash(chunk) for chunk_id, chunk in zip(chunk_ids, chunks)}
+    
+    previous = get_ingest_manifest().get_chunks(company_identifier)
+    if previous is None:
+        # Never indexed through the manifest: start from a clean slate for this company
+        clear_company_documents(company_identifier)
+        previous = {}
+    changed, removed = diff_chunks(previous, chunk_hashes)
+    changed = set(changed)
+    
+    # Embed all new/changed chunks in batches (one float32 row per chunk); chunks embedded
+    # before (e.g. moved to another position) come from the on-disk embedding cache
+    changed_chunks = [(chunk_id, chunk) for chunk_id, chunk in zip(chunk_ids, chunks) if chunk_id in changed]
+    embeddings = embed_texts_cached(None, [chunk for _, chunk in changed_chunks])
     
-    for i, chunk in enumerate(chunks):
-        embedding = embedding_model.encode(chunk).tolist()
+    documents = []
+    for (chunk_id, chunk), embedding in zip(changed_chunks, embeddings):
         documents.append({
-            "id": f"{company_identifier}_{i:04d}",  # Use predictable IDs: novasynth_0001, novasynth_0002, etc.
+            "id": chunk_id,
+            "company_id": company_identifier,  # Filterable field for per-company vector queries
             "content": chunk,
-            "content_vector": embedding
+            "content_vector": embedding.tolist()
         })
     
-    search_client.upload_documents(documents=documents)
+    if documents:
+        get_search_backend().upsert(documents)
+    if removed:
+        get_search_backend().delete(removed)
+    
+    get_ingest_manifest().set_chunks(company_identifier, chunk_hashes)
+    print(f"DEBUG: Upserted {len(documents)} chunks, deleted {len(removed)}, unchanged {len(chunks) - len(documents)}")
+    return company_identifier
+
+def sync_blob_index(container_name, num_docs=4, company=None):
+    """Index the latest blobs incrementally; returns the company identifier.
+    When the latest blobs are the same (name + etag) as last time and the index still holds
+    the recorded chunks, nothing is downloaded, embedded or written to the index.
+    With `company`, only that company's blobs are read."""
+    company = company.lower() if company else None
+    source = f"{container_name}/{company}" if company else container_name
+    manifest = get_ingest_manifest()
+    _, blobs = list_latest_blobs(container_name, num_docs, company)
+    recorded = manifest.get_source(source)
+    recorded_chunks = manifest.get_chunks(recorded["company"]) if recorded else None
+    if recorded_chunks is not None:
+        recorded_etags = {name: info["etag"] for name, info in recorded["blobs"].items()}
+        if recorded_etags == {blob.name: blob.etag for blob in blobs}:
+            if set(recorded_chunks) <= set(get_search_backend().list_ids(recorded["company"])):
+                print(f"DEBUG: Blobs unchanged since last index, skipping re-index for {recorded['company']}")
+                return recorded["company"]
+            # The index lost chunks (cleared or recreated outside the pipeline): re-index from scratch
+            print(f"DEBUG: Index is missing recorded chunks for {recorded['company']}, re-indexing")
+            manifest.forget_company(recorded["company"])
+    
+    blob_hashes = {}
+    raw_text = read_latest_documents_from_blob(container_name, num_docs, blob_hashes=blob_hashes, company=company)
+    company_identifier = index_to_azure_search(raw_text, company)
+    manifest.set_source(source, blob_hashes, company_identifier)
     return company_identifier
 
 def clear_company_documents(company_identifier):
     """Clear existing documents for a company using search instead of filter"""
     try:
-        # Use search to find documents with company prefix
-        results = search_client.search(f"id:{company_identifier}_*", select=["id"])
-        
-        doc_ids = []
-        for result in results:
-            doc_ids.append(result["id"])
+        # Find documents with the company prefix
+        doc_ids = get_search_backend().list_ids(company_identifier)
         
         if doc_ids:
             # Delete existing documents
-            delete_docs = [{"@search.action": "delete", "id": doc_id} for doc_id in doc_ids]
-            search_client.upload_documents(documents=delete_docs)
+            get_search_backend().delete(doc_ids)
             print(f"DEBUG: Cleared {len(doc_ids)} existing documents for {company_identifier}")
+        get_ingest_manifest().forget_company(company_identifier)
         
     except Exception as e:
         print(f"DEBUG: Could not clear existing documents: {e}")
 
 def index_uploaded_documents_from_blob():
     """Index documents with automatic company detection"""
-    full_text = read_latest_documents_from_blob(container_name, 4)
-    
-    # Detect which company this is
-    company_identifier = None
-    if "nova synth" in full_text.lower() or "novasynth" in full_text.lower():
-        company_identifier = "novasynth"
-    elif "terradrive" in full_text.lower() or "terra drive" in full_text.lower():
-        company_identifier = "terradrive"
-    else:
-        company_identifier = "novasynth"  # Default
-    
+    company_identifier = sync_blob_index(container_name, 4)
     print(f"DEBUG: Detected company: {company_identifier}")
-    
-    # Clear existing documents for this company
-    clear_company_documents(company_identifier)
-    
-    chunks = [full_text[i:i+1000] for i in range(0, len(full_text), 1000)]
-    documents = []
-
-    for i, chunk in enumerate(chunks):
-        embedding = embedding_model.encode(chunk).tolist()
-        documents.append({
-            "id": f"{company_identifier}_{i:04d}",  # FIXED: Use company prefix, not UUID!
-            "content": chunk,
-            "content_vector": embedding
-        })
-
-    result = search_client.upload_documents(documents=documents)
-    print(f"DEBUG: Indexed {len(documents)} chunks with company prefix")
     return company_identifier
 
 # === Step 3: Search using RAG
-embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
-search_client = SearchClient(
-    endpoint=AZURE_SEARCH_ENDPOINT,
-    index_name=INDEX_NAME,
-    credential=AzureKeyCredential(AZURE_SEARCH_KEY)
-)
 
 def search_rag(query, company_filter=None):
-    """Vector search without problematic filters"""
+    """Vector search, pre-filtered to one company's chunks when company_filter is given"""
     
-    query_vector = embedding_model.encode(query).tolist()
+    # Repeated queries (e.g. QUERY_TEXT) are served from the embedding cache
+    # (the model is only loaded if the query is not cached yet)
+    query_vector = embed_texts_cached(None, [query])[0].tolist()
 
-    url = f"{AZURE_SEARCH_ENDPOINT}/indexes/{INDEX_NAME}/docs/search?api-version=2023-07-01-preview"
-    headers = {
-        "Content-Type": "application/json",
-        "api-key": AZURE_SEARCH_KEY
-    }
-    
-    # Use vector search WITHOUT the problematic filter
-    payload = {
-        "vectors": [
-            {
-                "value": query_vector,
-                "fields": "content_vector",
-                "k": 8
-            }
-        ],
-        "top": 8
-    }
-    
-    # Don't use the problematic startswith filter
-    print(f"DEBUG: Vector search (no filter - will filter by content)")
+    # Filter on company_id before ranking, so all k results belong to the company
+    company_id = company_filter.lower() if company_filter else None
+    search_backend = get_search_backend()
+    print(f"DEBUG: Vector search ({search_backend.name} backend, company_id filter: {company_id})")
     
     try:
-        response = requests.post(url, headers=headers, data=json.dumps(payload))
+        results = search_backend.vector_search(query_vector, k=8, company_id=company_id)
+        documents = [doc.get("content", "")[:2000] for doc in results]
         
-        if response.status_code == 200:
-            results = response.json()
-            documents = []
-            
-            for doc in results.get("value", []):
-                content = doc.get("content", "")
-                doc_id = doc.get("id", "")
-                
-                # Filter by content instead of ID filter
-                if company_filter:
-                    if company_filter.lower() in content.lower() or company_filter in doc_id.lower():
-                        documents.append(content[:2000])
-                else:
-                    documents.append(content[:2000])
-            
-            print(f"DEBUG: Found {len(documents)} documents for {company_filter}")
-            return "\n\n".join(documents[:4])
-        else:
-            print(f"DEBUG: Vector search failed: {response.text}")
-            return "No documents found"
+        print(f"DEBUG: Found {len(documents)} documents for {company_filter}")
+        return "\n\n".join(documents[:4])
             
     except Exception as e:
         print(f"DEBUG: Vector search error: {e}")
@@ -353,8 +336,7 @@ def extract_numeric_value(line):
 # === Step 5: Bureau Agent Pipeline ===
 def bureau_agent_pipeline():
     try:
-        raw_text = read_latest_documents_from_blob(container_name)
-        company_identifier = index_to_azure_search(raw_text)  # Get company ID from indexing
+        company_identifier = sync_blob_index(container_name)  # Get company ID from (incremental) indexing
     except Exception as e:
         return {"errorMessage": f"Blob indexing failed: {e}", "status": "AgentStatus.failed"}
 
@@ -537,15 +519,14 @@ def extract_fields_from_rag_context(rag_context):
 def clear_all_documents():
     """Clear all documents from index to start fresh"""
     try:
-        results = search_client.search("*", select=["id"])
-        doc_ids = [result["id"] for result in results]
+        doc_ids = get_search_backend().list_ids()
         
         if doc_ids:
-            delete_docs = [{"@search.action": "delete", "id": doc_id} for doc_id in doc_ids]
-            search_client.upload_documents(documents=delete_docs)
+            get_search_backend().delete(doc_ids)
             print(f"Cleared {len(doc_ids)} documents from index")
         else:
             print("Index is already empty")
+        get_ingest_manifest().reset()
     except Exception as e:
         print(f"Error clearing index: {e}")
 
@@ -564,8 +545,7 @@ def test_company_separation():
     
     # Check what documents exist
     try:
-        results = search_client.search("*", select=["id"], top=10)
-        doc_ids = [result["id"] for result in results]
+        doc_ids = get_search_backend().list_ids()[:10]
         print(f"Current document IDs: {doc_ids}")
         
         novasynth_docs = [doc_id for doc_id in doc_ids if "novasynth" in doc_id]
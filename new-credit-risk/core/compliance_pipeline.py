@@ -4,19 +4,8 @@
 
 import os                    # For reading the summary file
 import json                  # For parsing JSON-formatted responses
-from azure.identity import DefaultAzureCredential  # Azure authentication
-from azure.ai.projects import AIProjectClient       # Main entry to interact with Azure AI project
-from azure.ai.agents.models import ListSortOrder    # Sort messages when reading agent replies
-
-# =====================================
-# Azure AI Project Initialization
-# =====================================
-
-# Create client to interact with the Azure AI Agent Project
-project = AIProjectClient(
-    credential=DefaultAzureCredential(),  # Automatically handles Azure credentials
-    endpoint="https://akshitasurya.services.ai.azure.com/api/projects/CreditRiskAssessor"  # Replace with your project URL
-)
+from core.azure_clients import COMPLIANCE_AGENT_ID          # Legal compliance agent ID
+from core.agent_runs import run_agent, run_agent_async      # Shared sync/async agent thread runs
 
 # =====================================
 # Legal Compliance Checklist
@@ -34,25 +23,12 @@ LEGAL_NORMS = [
 ]
 
 # =====================================
-# Compliance Agent Pipeline Logic
+# Prompt & Response Handling
 # =====================================
 
-def compliance_agent_pipeline(summary_text: str) -> dict:
-    """
-    Evaluates a financial document summary for compliance issues using Azure AI Agent.
-
-    Parameters:
-    - summary_text (str): Text summary of the document to be checked
-
-    Returns:
-    - dict: Output containing detected compliance issues, risk level, and recommendations
-    """
-
-    # Get the specific Azure agent for legal compliance
-    agent = project.agents.get_agent("asst_jma5gWHJMxPQt271vldw4mwg")
-
-    # Construct the prompt for the assistant (LLM) to evaluate
-    prompt = f"""
+def _build_prompt(summary_text: str) -> str:
+    """Constructs the prompt for the assistant (LLM) to evaluate."""
+    return f"""
     You are a legal compliance checker agent. Given the following document summary, identify any violations or risks:
 
     Summary:
@@ -64,41 +40,68 @@ def compliance_agent_pipeline(summary_text: str) -> dict:
     Respond in JSON format with keys: "compliance_issues", "risk_level", and "recommendations".
     """
 
-    try:
-        # -------------------------------------
-        # Initiate Agent Interaction
-        # -------------------------------------
-        thread = project.agents.threads.create()  # Create new message thread
-        project.agents.messages.create(thread_id=thread.id, role="user", content=prompt)  # Send user message
-        project.agents.runs.create_and_process(thread_id=thread.id, agent_id=agent.id)    # Start and run the agent
 
-        # -------------------------------------
-        # Retrieve and Parse Agent Response
-        # -------------------------------------
-        messages = list(project.agents.messages.list(thread_id=thread.id, order=ListSortOrder.ASCENDING))
-        assistant_reply = next((m for m in reversed(messages) if m.role == "assistant"), None)
+def _parse_reply(content: str) -> dict:
+    """Parses the agent's reply text into the compliance result."""
+    # If no valid response found
+    if not content:
+        return {"error": "No response from agent."}
+
+    # Remove Markdown-style code block if wrapped in ```json
+    if content.startswith("```json"):
+        content = content.strip("```json").strip("`").strip()
+
+    # Return parsed JSON output
+    return json.loads(content)
+
+
+def _parse_error(content, error: Exception) -> dict:
+    """Fallback in case parsing fails or agent misbehaves."""
+    return {
+        "error": "Unable to parse agent response.",
+        "raw_output": content or "",
+        "details": str(error)
+    }
 
-        # If no valid response found
-        if not assistant_reply:
-            return {"error": "No response from agent."}
+# =====================================
+# Compliance Agent Pipeline Logic
+# =====================================
+
+def compliance_agent_pipeline(summary_text: str) -> dict:
+    """
+    Evaluates a financial document summary for compliance issues using Azure AI Agent.
+
+    Parameters:
+    - summary_text (str): Text summary of the document to be checked
+
+    Returns:
+    - dict: Output containing detected compliance issues, risk level, and recommendations
+    """
+    content = None
+    try:
+        # Run the (cached) legal compliance agent on the shared client and parse its reply
+        content = run_agent(COMPLIANCE_AGENT_ID, _build_prompt(summary_text))
+        return _parse_reply(content)
+    except Exception as e:
+        return _parse_error(content, e)
 
-        # Extract actual text from the agent's reply
-        content = assistant_reply.text_messages[0].text.value if assistant_reply.text_messages else ""
 
-        # Remove Markdown-style code block if wrapped in ```json
-        if content.startswith("```json"):
-            content = content.strip("```json").strip("`").strip()
+async def compliance_agent_pipeline_async(summary_text: str) -> dict:
+    """
+    Async version of compliance_agent_pipeline built on the async Azure AI Projects client.
 
-        # Return parsed JSON output
-        return json.loads(content)
+    Parameters:
+    - summary_text (str): Text summary of the document to be checked
 
+    Returns:
+    - dict: Same structure as compliance_agent_pipeline
+    """
+    content = None
+    try:
+        content = await run_agent_async(COMPLIANCE_AGENT_ID, _build_prompt(summary_text))
+        return _parse_reply(content)
     except Exception as e:
-        # Fallback in case parsing fails or agent misbehaves
-        return {
-            "error": "Unable to parse agent response.",
-            "raw_output": content if 'content' in locals() else "",
-            "details": str(e)
-        }
+        return _parse_error(content, e)
 
 # =====================================
 # Standalone Testing Entry Point
@@ -6,9 +6,8 @@ import os                    # For file path handling (not used here, but common
 import re                    # For string and pattern parsing
 import json                  # To parse agent response as JSON
 from datetime import datetime  # To timestamp pipeline output
-from azure.identity import DefaultAzureCredential  # Azure credential setup
-from azure.ai.projects import AIProjectClient       # Azure AI Project client for managing agents
-from azure.ai.agents.models import ListSortOrder    # Sorts agent message threads
+from core.azure_clients import CREDIT_SCORING_AGENT_ID          # Credit scoring agent ID
+from core.agent_runs import run_agent, run_agent_async          # Shared sync/async agent thread runs
 
 # =====================================
 # Safe Float Utility
@@ -31,33 +30,12 @@ def safe_float(value, default=0.0):
         return default
 
 # =====================================
-# Main Credit Scoring Function
+# Prompt & Response Handling
 # =====================================
 
-def credit_scoring_pipeline(summary: str) -> dict:
-    """
-    Calls an Azure AI agent to evaluate creditworthiness based on a financial summary.
-
-    Parameters:
-    - summary (str): Structured summary text from Bureau Agent
-
-    Returns:
-    - dict: Structured result including credit score, PD, risk factors, confidence, and status
-    """
-
-    # -------------------------------------
-    # Azure Project & Agent Setup
-    # -------------------------------------
-    project = AIProjectClient(
-        credential=DefaultAzureCredential(),
-        endpoint="https://akshitasurya.services.ai.azure.com/api/projects/CreditRiskAssessor"
-    )
-    agent = project.agents.get_agent("asst_OPFiIidA5lUgry5IBnze5eKd")  # Credit scoring agent
-
-    # -------------------------------------
-    # Prompt to AI Agent
-    # -------------------------------------
-    prompt = f"""
+def _build_prompt(summary: str) -> str:
+    """Builds the credit scoring prompt for the Azure AI agent."""
+    return f"""
     You are a credit scoring assistant. Based on the structured summary below, return:
 
     - Credit Score (AAA to DDD)
@@ -74,22 +52,17 @@ def credit_scoring_pipeline(summary: str) -> dict:
     {summary}
     """
 
-    # -------------------------------------
-    # Agent Interaction: Create Thread & Send Prompt
-    # -------------------------------------
-    thread = project.agents.threads.create()
-    project.agents.messages.create(thread_id=thread.id, role="user", content=prompt)
-    project.agents.runs.create_and_process(thread_id=thread.id, agent_id=agent.id)
 
-    # Retrieve messages from the agent (sorted oldest to newest)
-    messages = project.agents.messages.list(thread_id=thread.id, order=ListSortOrder.ASCENDING)
+def _format_result(output: str) -> dict:
+    """
+    Parses the agent's reply into the schema-compliant credit scoring result.
+
+    Parameters:
+    - output (str): Raw text of the agent's final message
 
-    # Parse the agent's final message (the LLM response)
-    output = ""
-    for msg in messages:
-        if msg.role == "assistant" and msg.text_messages:
-            output = msg.text_messages[-1].text.value
-            break
+    Returns:
+    - dict: Structured result including credit score, PD, risk factors, confidence, and status
+    """
 
     # -------------------------------------
     # Clean Output: Remove Markdown Formatting if Present
@@ -140,3 +113,35 @@ def credit_scoring_pipeline(summary: str) -> dict:
         "status": "AgentStatus.complete",
         "errorMessage": None
     }
+
+# =====================================
+# Main Credit Scoring Function
+# =====================================
+
+def credit_scoring_pipeline(summary: str) -> dict:
+    """
+    Calls an Azure AI agent to evaluate creditworthiness based on a financial summary.
+
+    Parameters:
+    - summary (str): Structured summary text from Bureau Agent
+
+    Returns:
+    - dict: Structured result including credit score, PD, risk factors, confidence, and status
+    """
+    # Send the prompt to the (cached) credit scoring agent on the shared client
+    output = run_agent(CREDIT_SCORING_AGENT_ID, _build_prompt(summary))
+    return _format_result(output)
+
+
+async def credit_scoring_pipeline_async(summary: str) -> dict:
+    """
+    Async version of credit_scoring_pipeline built on the async Azure AI Projects client.
+
+    Parameters:
+    - summary (str): Structured summary text from Bureau Agent
+
+    Returns:
+    - dict: Same structure as credit_scoring_pipeline
+    """
+    output = await run_agent_async(CREDIT_SCORING_AGENT_ID, _build_prompt(summary))
+    return _format_result(output)
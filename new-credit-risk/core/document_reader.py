@@ -0,0 +1,141 @@
+# =====================================
+# Concurrent Blob Document Reader
+# =====================================
+# Downloads the latest bureau blobs in parallel and parses them off the calling
+# thread, so reading N documents takes about as long as the slowest one instead
+# of the sum of all of them:
+# - downloads run on a bounded thread pool (network-bound, releases the GIL)
+# - .docx/.xlsx parsing (CPU-bound, pure Python) runs in a process pool; each
+#   blob is handed to the pool as soon as its download finishes. The pool's
+#   workers come from a forkserver (core/parse_worker.py holds their code), as
+#   forking this multithreaded process could deadlock a child on a lock held by
+#   another thread
+# Results are returned in the order of the input blob list, so the combined
+# text (and the chunk IDs derived from it) is deterministic.
+
+import os                   # Pool sizes from the environment
+import threading            # Guards the shared pools
+import multiprocessing      # Start method for the parse pool
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor  # Download / parse pools
+from concurrent.futures.process import BrokenProcessPool               # Parse pool died (e.g. OOM kill)
+from core.ingest_manifest import content_hash  # Blob content hashes for the ingest manifest
+from core.parse_worker import PARSER_MODULES, load_parsers, parse_document, serialize_sheet, serialize_workbook  # Worker-side parsing
+
+# =====================================
+# Configuration
+# =====================================
+
+BLOB_DOWNLOAD_WORKERS = int(os.getenv("BLOB_DOWNLOAD_WORKERS", "8"))  # Parallel blob downloads
+BLOB_PARSE_WORKERS = int(os.getenv("BLOB_PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))  # 0 = parse in the download threads
+
+# =====================================
+# Shared Pools
+# =====================================
+
+_download_pool = None
+_parse_pool = None
+_pools_lock = threading.Lock()
+
+
+def _parse_context():
+    """
+    Uses a forkserver where available, spawn otherwise; never fork. Workers are created
+    lazily from the download threads, and forking a multithreaded process can copy a lock
+    held by another thread into the child, which then deadlocks.
+    The forkserver is a fresh single-threaded process that preloads the main module and the
+    parsers once, so each worker is forked from it ready to parse and does not import the
+    main module again (under spawn every worker imports it, see the guard in app.py).
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["__main__", "core.parse_worker", *PARSER_MODULES])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+def get_download_pool() -> ThreadPoolExecutor:
+    """Returns the shared download thread pool, creating it on first use."""
+    global _download_pool
+    with _pools_lock:
+        if _download_pool is None:
+            _download_pool = ThreadPoolExecutor(max_workers=BLOB_DOWNLOAD_WORKERS, thread_name_prefix="blob-download")
+        return _download_pool
+
+
+def get_parse_pool():
+    """Returns the shared parse process pool (None when BLOB_PARSE_WORKERS is 0)."""
+    global _parse_pool
+    if BLOB_PARSE_WORKERS <= 0:
+        return None
+    with _pools_lock:
+        if _parse_pool is None:
+            _parse_pool = ProcessPoolExecutor(max_workers=BLOB_PARSE_WORKERS, mp_context=_parse_context(),
+                                              initializer=load_parsers)
+        return _parse_pool
+
+
+def shutdown_pools(wait: bool = True):
+    """Shuts both pools down (new ones are created on next use)."""
+    global _download_pool, _parse_pool
+    with _pools_lock:
+        pools = [_download_pool, _parse_pool]
+        _download_pool = _parse_pool = None
+    for pool in pools:
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+
+def _discard_parse_pool(pool):
+    """Drops a broken parse pool so the next call starts a fresh one."""
+    global _parse_pool
+    with _pools_lock:
+        if _parse_pool is pool:
+            _parse_pool = None
+    pool.shutdown(wait=False)
+
+# =====================================
+# Concurrent Reader
+# =====================================
+
+def read_documents(container_client, blob_names: list, blob_hashes: dict = None, etags: dict = None) -> list:
+    """
+    Downloads and parses blobs concurrently.
+
+    Parameters:
+    - container_client (ContainerClient): Container holding the blobs.
+    - blob_names (list): Blob names, in the order the texts should be returned.
+    - blob_hashes (dict): If given, filled with name -> {"etag", "sha256"}.
+    - etags (dict): name -> etag, recorded into `blob_hashes`.
+
+    Returns:
+    - list: "--- File: <name> ---\\n<text>" sections, in `blob_names` order.
+    """
+    parse_pool = get_parse_pool()
+
+    def download_and_submit(name):
+        data = container_client.download_blob(name).readall()
+        if blob_hashes is not None:
+            blob_hashes[name] = {"etag": (etags or {}).get(name), "sha256": content_hash(data)}
+        if parse_pool is None:
+            return name, data, None
+        # Hand the bytes to a parse worker right away; other downloads keep running
+        try:
+            return name, data, parse_pool.submit(parse_document, name, data)
+        except (BrokenProcessPool, RuntimeError):
+            return name, data, None
+
+    downloads = [get_download_pool().submit(download_and_submit, name) for name in blob_names]
+
+    sections = []
+    for download in downloads:  # Input order, not completion order
+        name, data, parse = download.result()
+        if parse is None:
+            content = parse_document(name, data)
+        else:
+            try:
+                content = parse.result()
+            except BrokenProcessPool:
+                _discard_parse_pool(parse_pool)
+                content = parse_document(name, data)
+        sections.append(f"--- File: {name} ---\n{content}")
+    return sections
@@ -0,0 +1,194 @@
+# =====================================
+# Persistent Embedding Cache
+# =====================================
+# Stores text embeddings on disk keyed by (model name, sha256 of the text), so the
+# same financial statements, chunks and queries are embedded only once across
+# runs and processes. Each model gets:
+# - <model>.vectors.f32  raw float32 rows, read through a read-only np.memmap
+#   (zero-copy: every process maps the same pages from the OS page cache)
+# - <model>.index        append-only sidecar, one sha256 per line (line i = row i)
+# - <model>.meta.json    model name and embedding dimension
+# Writers append under an exclusive file lock; readers pick up new rows by
+# re-reading only the newly appended part of the index.
+
+import os                   # Cache files
+import re                   # File-safe model names
+import json                 # Meta file
+import hashlib              # Text hashes
+import threading            # In-process locking
+import numpy as np          # Memory-mapped vectors
+
+try:
+    import fcntl            # Cross-process file lock (POSIX)
+except ImportError:         # Windows: fall back to in-process locking only
+    fcntl = None
+
+# =====================================
+# Configuration
+# =====================================
+
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", os.path.join("output_data", "embedding_cache"))
+
+
+def text_hash(text: str) -> str:
+    """Returns the sha256 hex digest used as the cache key of a text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+# =====================================
+# Cache
+# =====================================
+
+class EmbeddingCache:
+    """
+    Memory-mapped embedding store for one model.
+
+    Parameters:
+    - model_name (str): Embedding model name (part of the cache key).
+    - directory (str): Folder holding the cache files.
+    """
+
+    def __init__(self, model_name: str, directory: str = EMBEDDING_CACHE_DIR):
+        self.model_name = model_name
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        self._vectors_path = os.path.join(directory, f"{slug}.vectors.f32")
+        self._index_path = os.path.join(directory, f"{slug}.index")
+        self._meta_path = os.path.join(directory, f"{slug}.meta.json")
+        self._lock_path = os.path.join(directory, f"{slug}.lock")
+
+        self._lock = threading.Lock()
+        self._rows = {}          # sha256 -> row number
+        self._index_offset = 0   # Bytes of the index file already read
+        self._dim = None
+        self._vectors = None     # np.memmap of shape (rows, dim)
+        self._counters = {"hits": 0, "misses": 0, "writes": 0}
+
+    # -------------------------------------
+    # Reading
+    # -------------------------------------
+    def _refresh(self):
+        """Loads rows appended since the last refresh (by this or another process). Call with lock held."""
+        if self._dim is None:
+            try:
+                with open(self._meta_path, "r", encoding="utf-8") as f:
+                    self._dim = json.load(f)["dim"]
+            except (OSError, ValueError, KeyError):
+                return
+
+        try:
+            size = os.path.getsize(self._index_path)
+        except OSError:
+            return
+        if size == self._index_offset and self._vectors is not None:
+            return
+
+        with open(self._index_path, "rb") as f:
+            f.seek(self._index_offset)
+            appended = f.read()
+        # Only consume complete lines; a partially written line is read next time
+        complete = appended[:appended.rfind(b"\n") + 1]
+        for line in complete.decode("ascii").splitlines():
+            self._rows.setdefault(line, len(self._rows))
+        self._index_offset += len(complete)
+
+        if self._rows:
+            self._vectors = np.memmap(
+                self._vectors_path, dtype=np.float32, mode="r", shape=(len(self._rows), self._dim)
+            )
+
+    def get_many(self, hashes: list) -> tuple:
+        """
+        Looks up embeddings by text hash.
+
+        Returns:
+        - tuple: (dict position -> vector view for hits, list of positions that missed)
+        """
+        with self._lock:
+            self._refresh()
+            found, missing = {}, []
+            for position, digest in enumerate(hashes):
+                row = self._rows.get(digest)
+                if row is None:
+                    missing.append(position)
+                else:
+                    found[position] = self._vectors[row]  # Read-only view into the mapped file
+            self._counters["hits"] += len(found)
+            self._counters["misses"] += len(missing)
+            return found, missing
+
+    # -------------------------------------
+    # Writing
+    # -------------------------------------
+    def put_many(self, hashes: list, vectors: np.ndarray):
+        """Appends embeddings for hashes that are not cached yet."""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if not len(hashes):
+            return
+        with self._lock, open(self._lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._ensure_meta(vectors.shape[1])
+                self._refresh()
+
+                new_rows, new_hashes, seen = [], [], set()
+                for digest, vector in zip(hashes, vectors):
+                    if digest not in self._rows and digest not in seen:
+                        seen.add(digest)
+                        new_rows.append(vector)
+                        new_hashes.append(digest)
+                if not new_hashes:
+                    return
+
+                # Drop vector bytes left by an interrupted write so rows stay aligned with the index
+                row_bytes = self._dim * np.dtype(np.float32).itemsize
+                expected_bytes = len(self._rows) * row_bytes
+                with open(self._vectors_path, "ab") as f:
+                    if os.path.getsize(self._vectors_path) > expected_bytes:
+                        f.truncate(expected_bytes)
+                    f.write(np.stack(new_rows).tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+                # Index lines are written last: a row only becomes visible once its vector exists
+                with open(self._index_path, "ab") as f:
+                    f.write("".join(f"{digest}\n" for digest in new_hashes).encode("ascii"))
+                self._counters["writes"] += len(new_hashes)
+                self._refresh()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _ensure_meta(self, dim: int):
+        if self._dim is None and not os.path.exists(self._meta_path):
+            with open(self._meta_path, "w", encoding="utf-8") as f:
+                json.dump({"model": self.model_name, "dim": int(dim)}, f)
+        self._refresh()
+        if self._dim is None:
+            self._dim = int(dim)
+        if self._dim != dim:
+            raise ValueError(f"Embedding cache for {self.model_name} holds {self._dim}-d vectors, got {dim}-d")
+
+    def stats(self) -> dict:
+        """Reports cached rows and hit/miss counters."""
+        with self._lock:
+            self._refresh()
+            return {"model": self.model_name, "rows": len(self._rows), "dim": self._dim, **self._counters}
+
+# =====================================
+# Shared Instances
+# =====================================
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(model_name: str) -> EmbeddingCache:
+    """Returns the process-wide cache for a model."""
+    with _caches_lock:
+        cache = _caches.get(model_name)
+        if cache is None:
+            cache = _caches[model_name] = EmbeddingCache(model_name)
+        return cache
@@ -0,0 +1,121 @@
+# =====================================
+# Batched Embedding Stage
+# =====================================
+# Encodes many texts with a SentenceTransformer in batches instead of one
+# `model.encode(chunk)` call per chunk, so tokenization and the forward pass
+# run over a whole batch. Returns one contiguous float32 matrix (rows = texts)
+# that can be stored, searched or split into per-document vectors.
+# embed_texts_cached serves previously embedded texts from the persistent
+# embedding cache and only encodes the misses.
+# get_embedding_model is the single provider of the SentenceTransformer: it is
+# loaded on first use, once per process, and shared by every caller.
+
+import os                   # Batch size / thread settings from the environment
+import time                 # Model load timing
+import threading            # One model load, even under concurrent first requests
+import numpy as np          # Embedding matrix
+from core.embedding_cache import EMBEDDING_CACHE_ENABLED, get_embedding_cache, text_hash  # Persistent vectors
+
+# =====================================
+# Configuration
+# =====================================
+
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "32"))  # Texts per forward pass
+EMBED_THREADS = int(os.getenv("EMBED_THREADS", "0"))         # CPU threads for encoding (0 = torch default)
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"                     # SentenceTransformer used for the search index
+
+
+# =====================================
+# Model Provider
+# =====================================
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+def get_embedding_model(model_name: str = EMBEDDING_MODEL_NAME):
+    """
+    Returns the process-wide SentenceTransformer for `model_name`, loading it on first use.
+
+    sentence-transformers (and torch) are only imported here, so importing a module
+    that embeds text costs nothing until the first text is actually embedded.
+    """
+    model = _models.get(model_name)
+    if model is not None:
+        return model
+    with _models_lock:
+        if model_name not in _models:
+            from sentence_transformers import SentenceTransformer  # Heavy import (torch), deferred to first use
+            started = time.perf_counter()
+            _models[model_name] = SentenceTransformer(model_name)
+            print(f"Loaded embedding model '{model_name}' in {time.perf_counter() - started:.3f}s")
+        return _models[model_name]
+
+
+def set_embedding_threads(threads: int = EMBED_THREADS):
+    """Sets the number of CPU threads torch uses for encoding (0 keeps the default)."""
+    if threads and threads > 0:
+        import torch  # Installed with sentence-transformers; only needed when overriding threads
+        if torch.get_num_threads() != threads:
+            torch.set_num_threads(threads)
+
+
+def embed_texts(model, texts, batch_size: int = EMBED_BATCH_SIZE, threads: int = EMBED_THREADS) -> np.ndarray:
+    """
+    Encodes texts in batches.
+
+    Parameters:
+    - model (SentenceTransformer): Embedding model.
+    - texts (list): Texts to encode.
+    - batch_size (int): Texts per forward pass.
+    - threads (int): CPU threads for encoding (0 keeps the current setting).
+
+    Returns:
+    - np.ndarray: C-contiguous float32 matrix of shape (len(texts), embedding dimension).
+    """
+    texts = list(texts)
+    if not texts:
+        return np.empty((0, model.get_sentence_embedding_dimension()), dtype=np.float32)
+
+    set_embedding_threads(threads)
+    vectors = model.encode(texts, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False)
+    return np.ascontiguousarray(vectors, dtype=np.float32)
+
+
+def embed_texts_cached(model, texts, model_name: str = EMBEDDING_MODEL_NAME,
+                       batch_size: int = EMBED_BATCH_SIZE, threads: int = EMBED_THREADS) -> np.ndarray:
+    """
+    Same as embed_texts, but reuses embeddings cached on disk under (model_name, sha256(text))
+    and stores the newly computed ones.
+
+    Parameters:
+    - model (SentenceTransformer): Embedding model (only used for cache misses); None uses
+      get_embedding_model(model_name), so a fully cached call never loads the model.
+    - texts (list): Texts to encode.
+    - model_name (str): Name of `model`; part of the cache key.
+    - batch_size (int): Texts per forward pass for the misses.
+    - threads (int): CPU threads for encoding (0 keeps the current setting).
+
+    Returns:
+    - np.ndarray: C-contiguous float32 matrix of shape (len(texts), embedding dimension).
+    """
+    texts = list(texts)
+    if not texts and model is None:
+        return np.empty((0, 0), dtype=np.float32)  # Nothing to embed: don't load the model for its dimension
+    if not EMBEDDING_CACHE_ENABLED or not texts:
+        return embed_texts(model or get_embedding_model(model_name), texts, batch_size=batch_size, threads=threads)
+
+    cache = get_embedding_cache(model_name)
+    hashes = [text_hash(text) for text in texts]
+    found, missing = cache.get_many(hashes)
+    if not missing:
+        return np.stack([found[i] for i in range(len(texts))])
+
+    computed = embed_texts(model or get_embedding_model(model_name), [texts[i] for i in missing], batch_size=batch_size, threads=threads)
+    cache.put_many([hashes[i] for i in missing], computed)
+
+    result = np.empty((len(texts), computed.shape[1]), dtype=np.float32)
+    for position, vector in found.items():
+        result[position] = vector
+    result[missing] = computed
+    return result
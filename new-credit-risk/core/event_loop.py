@@ -0,0 +1,87 @@
+# =====================================
+# Background Event Loop
+# =====================================
+# Hosts a single long-lived asyncio event loop on a daemon thread.
+# Synchronous code (e.g. Flask request handlers or job workers) submits coroutines
+# to it instead of creating and closing a new loop per request, so async clients
+# bound to the loop (such as the pooled HTTP connections inside AzureChatCompletion)
+# stay warm across requests.
+
+import asyncio     # Event loop and thread-safe coroutine submission
+import threading   # Runs the loop on its own daemon thread
+
+
+class BackgroundEventLoop:
+    """
+    Owns an asyncio event loop that runs forever on a background thread.
+
+    Usage:
+        runner = BackgroundEventLoop()
+        result = runner.run(some_coroutine(), timeout=120)
+    """
+
+    def __init__(self, name: str = "background-event-loop"):
+        self.name = name
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Returns the running loop, starting the background thread on first use."""
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._start()
+            return self._loop
+
+    def _start(self):
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def _serve():
+            asyncio.set_event_loop(loop)
+            loop.call_soon(ready.set)
+            loop.run_forever()
+
+        self._thread = threading.Thread(target=_serve, name=self.name, daemon=True)
+        self._thread.start()
+        ready.wait()
+        self._loop = loop
+
+    def submit(self, coro):
+        """
+        Schedules a coroutine on the background loop.
+
+        Returns:
+        - concurrent.futures.Future: Resolves with the coroutine's result.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout: float = None):
+        """
+        Runs a coroutine on the background loop and blocks the calling thread until it finishes.
+
+        Parameters:
+        - coro: The coroutine to execute.
+        - timeout (float): Seconds to wait before cancelling the coroutine (None waits forever).
+
+        Raises:
+        - concurrent.futures.TimeoutError: If the coroutine does not finish within `timeout`.
+        """
+        future = self.submit(coro)
+        try:
+            return future.result(timeout=timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def stop(self):
+        """Stops the loop and waits for the background thread to exit."""
+        with self._lock:
+            if self._loop is None:
+                return
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = None
+            self._thread = None
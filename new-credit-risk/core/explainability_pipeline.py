@@ -4,32 +4,14 @@
 
 import os                   # File path operations
 import re                   # Regular expressions for parsing text
-import joblib               # Load serialized model pipeline
-import shap                 # SHAP for model interpretability
-import time                 # Sleep during async LLM wait
 import json                 # Formatting prompt and output
-import pandas as pd         # DataFrame construction
+import asyncio              # Offloads SHAP computation in the async pipeline
+import numpy as np          # Vectorized ranking of SHAP values
 from datetime import datetime  # For timestamping final output
-from azure.identity import DefaultAzureCredential  # Azure credential management
-from azure.ai.projects import AIProjectClient       # Azure AI Agent project client
-
-# =====================================
-# Load ML Pipeline & Model Once
-# =====================================
-
-pipeline_path = os.path.join("agents", "explainability_agent", "final_pipeline.pkl")
-pipeline = joblib.load(pipeline_path)                      # Full preprocessing + model pipeline
-model_only = pipeline.named_steps['randomforestclassifier']  # Extract only the model for SHAP use
-
-# =====================================
-# Azure AI Agent Setup
-# =====================================
-
-project = AIProjectClient(
-    credential=DefaultAzureCredential(),
-    endpoint="https://akshitasurya.services.ai.azure.com/api/projects/CreditRiskAssessor"
-)
-foundry_agent = project.agents.get_agent("asst_oDWcHiwhp6UWnWCUCHs892Bb")  # Explainability assistant agent
+from core.azure_clients import EXPLAINABILITY_AGENT_ID       # Explainability assistant agent ID
+from core.agent_runs import run_agent, run_agent_async       # Shared sync/async agent thread runs
+from core.model_registry import model_registry, get_model    # Models (and the SHAP explainer) loaded once per process
+from my_SemanticKernel.executor import get_plugin_executor   # Shared worker pool (PLUGIN_EXECUTOR_WORKERS)
 
 # =====================================
 # Utility Functions for Feature Extraction
@@ -70,24 +52,23 @@ def prettify_feature(name):
     return re.sub(r"\b(\w)", lambda m: m.group(1).upper(), name)
 
 # =====================================
-# Main Explainability Function
+# SHAP Analysis
 # =====================================
 
-def explainability_agent_pipeline(summary_text: str) -> dict:
-    """
-    Generates an interpretability report for a credit risk prediction using SHAP and Azure LLM.
-    
-    Parameters:
-    - summary_text (str): Extracted summary from Bureau Agent
+CLASS_IDX = 1  # Targeting "default risk = yes"
 
-    Returns:
-    - dict: Explanation output including feature impacts, weights, and LLM-generated summary
-    """
+def _build_shap_explainer(pipeline):
+    """Builds the TreeExplainer for the pipeline's RandomForest."""
+    import shap  # Deferred: shap (and the numba/scipy stack it pulls in) loads with the model, not at app start-up
+    return shap.TreeExplainer(pipeline.named_steps['randomforestclassifier'])
 
-    # -------------------------------------
-    # Feature Extraction
-    # -------------------------------------
-    row = {
+# Build the TreeExplainer once, right after final_pipeline.pkl loads, instead of
+# walking every tree of the RandomForest on each request
+model_registry.add_companion("explainability", "shap_explainer", _build_shap_explainer)
+
+def _feature_row(summary_text: str) -> dict:
+    """Extracts the model's input features from a financial summary."""
+    return {
         "Revenue": extract_value("Revenue", summary_text),
         "Net_Income": extract_value("Net Income", summary_text),
         "Total_Assets": extract_value("Total Assets", summary_text),
@@ -97,30 +78,85 @@ def explainability_agent_pipeline(summary_text: str) -> dict:
         "Country": normalize_country(extract_text("Country", summary_text)),
     }
 
-    df = pd.DataFrame([row])  # Convert to DataFrame for model input
 
-    # -------------------------------------
-    # Transform Input & Run SHAP Analysis
-    # -------------------------------------
-    X_transformed = pipeline.named_steps['columntransformer'].transform(df)
-    feature_names = pipeline.named_steps['columntransformer'].get_feature_names_out()
+def _shap_matrix(summary_texts: list):
+    """
+    Transforms all summaries and computes their SHAP values in one vectorized call.
+
+    Returns:
+    - tuple: (feature_names, shap values [rows x features] for CLASS_IDX, default probabilities [rows])
+    """
+    pipeline = get_model("explainability")  # Full preprocessing + model pipeline
+    explainer = model_registry.get_companion("explainability", "shap_explainer")
+    transformer = pipeline.named_steps['columntransformer']
+
+    import pandas as pd  # Deferred to first use; already loaded by the unpickled pipeline
+    df = pd.DataFrame([_feature_row(text) for text in summary_texts])  # One row per summary
+    X_transformed = transformer.transform(df)
+    feature_names = transformer.get_feature_names_out()
+
+    shap_values = explainer.shap_values(X_transformed)[:, :, CLASS_IDX]
+    # SHAP values are additive: base value + contributions = predicted probability
+    probabilities = explainer.expected_value[CLASS_IDX] + shap_values.sum(axis=1)
+    return feature_names, shap_values, probabilities
+
 
-    explainer = shap.TreeExplainer(model_only)
-    shap_values = explainer.shap_values(X_transformed)
-    class_idx = 1  # Targeting "default risk = yes"
+def _compute_contributions(summary_text: str) -> list:
+    """
+    Extracts model features from the summary and computes their SHAP contributions.
+
+    Parameters:
+    - summary_text (str): Extracted summary from Bureau Agent
+
+    Returns:
+    - list: (feature name, SHAP value) pairs sorted by absolute contribution
+    """
+    feature_names, shap_values, _ = _shap_matrix([summary_text])
 
     # Sort features by contribution strength
-    feature_shaps = shap_values[0, :, class_idx]
-    contributions = sorted(
-        zip(feature_names, feature_shaps),
+    return sorted(
+        zip(feature_names, shap_values[0]),
         key=lambda x: abs(x[1]),
         reverse=True
     )
 
-    # -------------------------------------
-    # Model Prediction & Prepare Explanation Prompt
-    # -------------------------------------
-    predicted_risk = model_only.predict_proba(X_transformed)[0][class_idx]
+
+def explainability_batch_pipeline(summary_texts: list) -> list:
+    """
+    Computes SHAP explanations for many summaries at once (e.g. portfolio reviews).
+    Uses one transform and one SHAP call for all rows and does not call the LLM agent.
+
+    Parameters:
+    - summary_texts (list): Financial summaries, one per company.
+
+    Returns:
+    - list: Per summary (same order), the predicted default risk and feature contributions
+      sorted by absolute impact.
+    """
+    if not summary_texts:
+        return []
+
+    feature_names, shap_values, probabilities = _shap_matrix(summary_texts)
+    pretty_names = [prettify_feature(name) for name in feature_names]
+    order = np.argsort(-np.abs(shap_values), axis=1)  # Strongest contribution first, per row
+
+    return [
+        {
+            "predicted_default_risk": round(float(probabilities[row]), 4),
+            "feature_contributions": [
+                {"feature": pretty_names[col], "shap_value": round(float(shap_values[row, col]), 6)}
+                for col in order[row]
+            ],
+        }
+        for row in range(len(summary_texts))
+    ]
+
+# =====================================
+# Explanation Prompt & Final Output
+# =====================================
+
+def _build_messages(contributions: list) -> list:
+    """Builds the thread messages asking the LLM to explain the SHAP results."""
     top_features = "\n".join([f"{name}: {float(val):+.4f}" for name, val in contributions[:7]])
 
     # Prompt for LLM to explain SHAP results
@@ -134,34 +170,14 @@ Key drivers behind this prediction include:
 
 Overall, the model has assessed a moderate level of risk based on these inputs. Please provide a clear and concise explanation of this prediction in business-friendly language, highlighting the most influential factors and their impact on the risk assessment.
 """
+    return [
+        ("user", "Explain why the default risk is predicted"),
+        ("assistant", explanation_prompt),
+    ]
+
 
-    # -------------------------------------
-    # Call Azure AI Agent for Explanation
-    # -------------------------------------
-    thread = project.agents.threads.create()
-    project.agents.messages.create(thread_id=thread.id, role="user", content="Explain why the default risk is predicted")
-    project.agents.messages.create(thread_id=thread.id, role="assistant", content=explanation_prompt)
-    project.agents.runs.create_and_process(thread_id=thread.id, agent_id=foundry_agent.id)
-
-    # Poll for assistant reply (retry max 5 times)
-    assistant_reply = None
-    for _ in range(5):
-        messages = list(project.agents.messages.list(thread_id=thread.id))
-        assistant_reply = next((m for m in reversed(messages) if m.role == "assistant"), None)
-        if assistant_reply:
-            break
-        time.sleep(2)  # Wait before retry
-
-    # Extract text explanation if available
-    foundry_explanation = ""
-    if assistant_reply:
-        foundry_explanation = "\n".join(
-            item["text"]["value"] for item in assistant_reply.content if item.get("type") == "text"
-        )
-
-    # -------------------------------------
-    # Final Output (Schema Compliant)
-    # -------------------------------------
+def _format_result(contributions: list, foundry_explanation: str) -> dict:
+    """Builds the schema-compliant explainability output."""
     return {
         "agentName": "Explainability",
         "agentDescription": "Provides detailed explanation of analysis decisions and factors",
@@ -183,6 +199,43 @@ Overall, the model has assessed a moderate level of risk based on these inputs.
         "errorMessage": None
     }
 
+# =====================================
+# Main Explainability Function
+# =====================================
+
+def explainability_agent_pipeline(summary_text: str) -> dict:
+    """
+    Generates an interpretability report for a credit risk prediction using SHAP and Azure LLM.
+    
+    Parameters:
+    - summary_text (str): Extracted summary from Bureau Agent
+
+    Returns:
+    - dict: Explanation output including feature impacts, weights, and LLM-generated summary
+    """
+    contributions = _compute_contributions(summary_text)
+
+    # Call the (cached) explainability agent; the reply arrives with the run's completion event
+    foundry_explanation = run_agent(EXPLAINABILITY_AGENT_ID, _build_messages(contributions))
+    return _format_result(contributions, foundry_explanation)
+
+
+async def explainability_agent_pipeline_async(summary_text: str) -> dict:
+    """
+    Async version of explainability_agent_pipeline built on the async Azure AI Projects client.
+
+    Parameters:
+    - summary_text (str): Extracted summary from Bureau Agent
+
+    Returns:
+    - dict: Same structure as explainability_agent_pipeline
+    """
+    # Model inference is CPU-bound, keep it off the event loop (on the shared plugin pool)
+    loop = asyncio.get_running_loop()
+    contributions = await loop.run_in_executor(get_plugin_executor(), _compute_contributions, summary_text)
+    foundry_explanation = await run_agent_async(EXPLAINABILITY_AGENT_ID, _build_messages(contributions))
+    return _format_result(contributions, foundry_explanation)
+
 # =====================================
 # Debug Entry Point
 # =====================================
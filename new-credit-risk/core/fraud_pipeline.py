@@ -5,33 +5,32 @@
 import os                   # File path operations
 import re                   # Regular expressions for extracting values
 import json                 # JSON formatting for LLM prompt
-import pandas as pd         # DataFrame creation for model input
-import joblib               # Model loading
+import asyncio              # Offloads model scoring in the async pipeline
 from datetime import datetime  # Timestamp for output
-from azure.identity import DefaultAzureCredential  # Azure authentication
-from azure.ai.projects import AIProjectClient       # Azure AI Agent client
+from core.azure_clients import FRAUD_AGENT_ID                # Fraud narrative agent ID
+from core.agent_runs import run_agent, run_agent_async        # Shared sync/async agent thread runs
+from core.model_registry import get_model                     # Models loaded once per process
+from my_SemanticKernel.executor import get_plugin_executor    # Shared worker pool (PLUGIN_EXECUTOR_WORKERS)
 
 
 # =====================================
-# Main Fraud Detection Function
+# Model Scoring
 # =====================================
-def fraud_detection_pipeline(summary_text: str) -> dict:
+def _score_summary(summary_text: str) -> dict:
     """
-    Analyzes a financial summary and predicts the likelihood of fraud using a trained ML model.
-    Also generates an AI-based explanation and returns a schema-compliant response.
-    
+    Extracts model features from the summary and scores them with the fraud model.
+
     Parameters:
     - summary_text (str): Financial summary text extracted by the Bureau agent.
 
     Returns:
-    - dict: Structured output with risk score, level, flagged items, AI summary, etc.
+    - dict: Features, fraud risk score/level, class probabilities and heuristic UI fields.
     """
 
     # -------------------------------------
-    # Load Pre-trained Fraud Detection Model
+    # Pre-trained Fraud Detection Model (loaded once per process)
     # -------------------------------------
-    model_path = "agents/fraud_detection/fraud_model.joblib"
-    model = joblib.load(model_path)  # Load model from disk
+    model = get_model("fraud")
 
     # -------------------------------------
     # Utility: Extract numerical fields (e.g., Revenue, Equity) from summary
@@ -65,6 +64,7 @@ def fraud_detection_pipeline(summary_text: str) -> dict:
     }
 
     # Convert extracted features into a DataFrame as expected by the model
+    import pandas as pd  # Deferred to first use, keeping it out of app start-up
     df = pd.DataFrame([features])
 
     # -------------------------------------
@@ -92,59 +92,90 @@ def fraud_detection_pipeline(summary_text: str) -> dict:
     verification_status = "Verified" if document_authenticity >= 0.9 else "Needs Review"
     flagged_items = [] if fraud_risk_score < 0.3 else ["Unusual liabilities", "Equity mismatch"]
 
-    # =====================================
-    # AI Explanation Using Azure Agent
-    # =====================================
-
-    # Connect to Azure AI Agent project
-    project = AIProjectClient(
-        credential=DefaultAzureCredential(),
-        endpoint="https://akshitasurya.services.ai.azure.com/api/projects/CreditRiskAssessor"
-    )
-    agent = project.agents.get_agent("asst_jma5gWHJMxPQt271vldw4mwg")
+    return {
+        "features": features,
+        "proba": proba,
+        "fraud_risk_score": fraud_risk_score,
+        "risk_level": risk_level,
+        "document_authenticity": document_authenticity,
+        "verification_status": verification_status,
+        "flagged_items": flagged_items
+    }
 
-    # Prompt for LLM to explain the model's findings
-    prompt = f"""
+# =====================================
+# AI Explanation Prompt & Final Output
+# =====================================
+def _build_prompt(scored: dict) -> str:
+    """Builds the prompt asking the LLM to explain the model's findings."""
+    return f"""
     You are a fraud analyst. Review the following features and risk score, and summarize the fraud risk:
 
     Features:
-    {json.dumps(features, indent=2)}
+    {json.dumps(scored["features"], indent=2)}
 
-    Model Score: {fraud_risk_score}
-    Risk Level: {risk_level}
+    Model Score: {scored["fraud_risk_score"]}
+    Risk Level: {scored["risk_level"]}
 
     Write a clear 1-2 sentence professional summary on fraud likelihood.
     """
 
-    # Start a conversation thread with the assistant
-    thread = project.agents.threads.create()
-    project.agents.messages.create(thread_id=thread.id, role="user", content=prompt)
-    project.agents.runs.create_and_process(thread_id=thread.id, agent_id=agent.id)
-
-    # Retrieve the assistant's message (final summary)
-    messages = list(project.agents.messages.list(thread_id=thread.id))
-    ai_summary = next((m.text_messages[-1].text.value for m in messages if m.text_messages), "No response.")
 
-    # =====================================
-    # Final Structured Output
-    # =====================================
+def _format_result(scored: dict, ai_summary: str) -> dict:
+    """Combines the model scores and the AI summary into the schema-compliant response."""
     return {
         "agentName": "Fraud Detection",
         "agentDescription": "Identifies potential fraud indicators and risk factors",
         "extractedData": {
-            "fraud_risk_score": fraud_risk_score,
-            "risk_level": risk_level,
-            "flagged_items": flagged_items,
-            "verification_status": verification_status,
-            "document_authenticity": document_authenticity
+            "fraud_risk_score": scored["fraud_risk_score"],
+            "risk_level": scored["risk_level"],
+            "flagged_items": scored["flagged_items"],
+            "verification_status": scored["verification_status"],
+            "document_authenticity": scored["document_authenticity"]
         },
-        "summary": ai_summary,
+        "summary": ai_summary or "No response.",
         "completedAt": datetime.utcnow().isoformat() + "Z",
-        "confidenceScore": round(proba.max(), 2),
+        "confidenceScore": round(scored["proba"].max(), 2),
         "status": "AgentStatus.complete",
         "errorMessage": None
     }
 
+# =====================================
+# Main Fraud Detection Function
+# =====================================
+def fraud_detection_pipeline(summary_text: str) -> dict:
+    """
+    Analyzes a financial summary and predicts the likelihood of fraud using a trained ML model.
+    Also generates an AI-based explanation and returns a schema-compliant response.
+    
+    Parameters:
+    - summary_text (str): Financial summary text extracted by the Bureau agent.
+
+    Returns:
+    - dict: Structured output with risk score, level, flagged items, AI summary, etc.
+    """
+    scored = _score_summary(summary_text)
+
+    # Ask the (cached) fraud agent on the shared client for a short explanation
+    ai_summary = run_agent(FRAUD_AGENT_ID, _build_prompt(scored))
+    return _format_result(scored, ai_summary)
+
+
+async def fraud_detection_pipeline_async(summary_text: str) -> dict:
+    """
+    Async version of fraud_detection_pipeline built on the async Azure AI Projects client.
+
+    Parameters:
+    - summary_text (str): Financial summary text extracted by the Bureau agent.
+
+    Returns:
+    - dict: Same structure as fraud_detection_pipeline
+    """
+    # Model inference is CPU-bound, keep it off the event loop (on the shared plugin pool)
+    loop = asyncio.get_running_loop()
+    scored = await loop.run_in_executor(get_plugin_executor(), _score_summary, summary_text)
+    ai_summary = await run_agent_async(FRAUD_AGENT_ID, _build_prompt(scored))
+    return _format_result(scored, ai_summary)
+
 # =====================================
 # CLI Debug/Test Entry Point
 # =====================================
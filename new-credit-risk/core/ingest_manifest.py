@@ -0,0 +1,173 @@
+# =====================================
+# Ingest Manifest
+# =====================================
+# Records what the bureau pipeline last indexed into each search target (the
+# Azure AI Search index or a local vector index folder, see
+# core.search_backends), so re-runs only touch what changed:
+# - per blob source (container): the blobs it read (etag + content sha256) and
+#   the company they were indexed under
+# - per company: the sha256 of every chunk document in the index
+# Entries are kept per target, so switching VECTOR_BACKEND (or the index name
+# or folder) starts from an empty record instead of skipping the new index.
+# The manifest is a small JSON file shared by every worker process. Each read
+# and update holds a file lock and reloads the file first (only when it changed
+# on disk), so an update is applied to the latest entries of all workers instead
+# of overwriting them with a stale copy; writes are atomic replaces.
+
+import os                   # Manifest location and atomic replace
+import json                 # On-disk format
+import hashlib              # Content hashes
+import threading            # Guards concurrent pipeline runs
+from contextlib import contextmanager  # Locked read/update sections
+
+try:
+    import fcntl            # Cross-process file lock (POSIX)
+except ImportError:         # Windows: fall back to in-process locking only
+    fcntl = None
+
+# =====================================
+# Configuration
+# =====================================
+
+INGEST_MANIFEST_PATH = os.getenv("INGEST_MANIFEST_PATH", os.path.join("output_data", "ingest_manifest.json"))
+MANIFEST_VERSION = 3  # Bump when the chunking or document layout changes, forcing a full re-index
+
+
+def content_hash(data) -> str:
+    """Returns the sha256 hex digest of bytes or text."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+# =====================================
+# Manifest
+# =====================================
+
+class IngestManifest:
+    """
+    JSON-backed record of the blobs and chunks indexed into one search target.
+
+    Parameters:
+    - target (str): Search target the entries belong to (a backend's `target`).
+    - path (str): Manifest file location (shared by all targets).
+    """
+
+    def __init__(self, target: str, path: str = INGEST_MANIFEST_PATH):
+        self.target = target
+        self.path = path
+        self._lock_path = f"{path}.lock"
+        self._lock = threading.Lock()
+        self._data = None
+        self._stamp = None  # (inode, mtime_ns, size) of the file self._data was read from
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @contextmanager
+    def _locked(self, exclusive: bool = False):
+        """
+        Holds the in-process lock and the manifest's file lock (shared for reads, exclusive
+        for updates) and yields this target's entries as currently on disk.
+        """
+        with self._lock, open(self._lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                self._refresh()
+                yield self._data["targets"].setdefault(self.target, {"sources": {}, "companies": {}})
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _refresh(self):
+        """Reloads the file if another process (or instance) changed it. Call with the locks held."""
+        try:
+            stat = os.stat(self.path)
+            stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)  # Every write is a new file (new inode)
+        except OSError:
+            stamp = None
+        if self._data is not None and stamp == self._stamp:
+            return
+        self._data, self._stamp = self._read(), stamp
+
+    def _read(self) -> dict:
+        empty = {"version": MANIFEST_VERSION, "targets": {}}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return empty
+        # A manifest from another layout version cannot be trusted for diffs
+        return data if data.get("version") == MANIFEST_VERSION else empty
+
+    def _write(self):
+        """Atomically replaces the file with self._data. Call inside _locked(exclusive=True)."""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._data, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        stat = os.stat(self.path)
+        self._stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    # -------------------------------------
+    # Blob Sources
+    # -------------------------------------
+    def get_source(self, source: str):
+        """Returns {"blobs": {name: {"etag", "sha256"}}, "company": ...} for a source, or None."""
+        with self._locked() as data:
+            entry = data["sources"].get(source)
+            return json.loads(json.dumps(entry)) if entry else None
+
+    def set_source(self, source: str, blobs: dict, company: str):
+        """Records the blobs a source was last indexed from and the company they belong to."""
+        with self._locked(exclusive=True) as data:
+            data["sources"][source] = {"blobs": blobs, "company": company}
+            self._write()
+
+    # -------------------------------------
+    # Company Chunks
+    # -------------------------------------
+    def get_chunks(self, company: str):
+        """Returns {chunk document ID: sha256} for a company, or None if it was never indexed."""
+        with self._locked() as data:
+            chunks = data["companies"].get(company)
+            return dict(chunks) if chunks is not None else None
+
+    def set_chunks(self, company: str, chunks: dict):
+        """Replaces the chunk hashes recorded for a company."""
+        with self._locked(exclusive=True) as data:
+            data["companies"][company] = dict(chunks)
+            self._write()
+
+    def forget_company(self, company: str):
+        """Drops a company's chunks (and the sources indexed under it), e.g. after clearing its documents."""
+        with self._locked(exclusive=True) as data:
+            data["companies"].pop(company, None)
+            data["sources"] = {
+                name: entry for name, entry in data["sources"].items() if entry.get("company") != company
+            }
+            self._write()
+
+    def reset(self):
+        """Forgets everything recorded for this target (e.g. after its whole index was cleared)."""
+        with self._locked(exclusive=True) as data:
+            data["sources"].clear()
+            data["companies"].clear()
+            self._write()
+
+
+def diff_chunks(previous: dict, current: dict) -> tuple:
+    """
+    Compares recorded and current chunk hashes.
+
+    Parameters:
+    - previous (dict): Recorded {chunk ID: sha256}.
+    - current (dict): Current {chunk ID: sha256}.
+
+    Returns:
+    - tuple: (IDs to upsert because they are new or changed, IDs to delete because they disappeared)
+    """
+    changed = [chunk_id for chunk_id, digest in current.items() if previous.get(chunk_id) != digest]
+    removed = [chunk_id for chunk_id in previous if chunk_id not in current]
+    return changed, removed
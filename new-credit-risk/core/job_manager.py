@@ -0,0 +1,169 @@
+# =====================================
+# Background Job Manager
+# =====================================
+# Runs long pipelines (such as the Semantic Kernel smart controller) on a bounded
+# worker pool so HTTP handlers can return a job ID immediately instead of holding
+# a web worker for the whole agent chain. Clients poll for status and results.
+
+import os                       # Reading worker/queue sizing from the environment
+import time                     # Monotonic timings for queue and run durations
+import uuid                     # Unique job identifiers
+import threading                # Guards the shared job table
+import traceback                # Captures failures for the server logs
+from collections import OrderedDict  # Keeps jobs in submission order for pruning
+from concurrent.futures import ThreadPoolExecutor  # Bounded worker pool
+from datetime import datetime, timezone  # Timestamps in job records
+
+# =====================================
+# Configuration
+# =====================================
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))          # Concurrent jobs
+JOB_MAX_QUEUE = int(os.getenv("JOB_MAX_QUEUE", "32"))     # Jobs allowed to wait for a worker
+JOB_RETENTION = int(os.getenv("JOB_RETENTION", "200"))    # Finished jobs kept for polling
+
+# Job lifecycle states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class JobQueueFull(RuntimeError):
+    """Raised when a job is submitted while the wait queue is already full."""
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+# =====================================
+# Job Manager
+# =====================================
+
+class JobManager:
+    """
+    Tracks jobs submitted to a fixed-size thread pool.
+
+    Parameters:
+    - max_workers (int): Number of jobs that may run at the same time.
+    - max_queue (int): Number of jobs allowed to wait for a free worker before
+      new submissions are rejected with JobQueueFull.
+    - retention (int): Number of finished jobs kept in memory for polling.
+    """
+
+    def __init__(self, max_workers: int = JOB_WORKERS, max_queue: int = JOB_MAX_QUEUE,
+                 retention: int = JOB_RETENTION):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retention = retention
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job-worker")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._totals = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0}
+        self._queue_seconds_total = 0.0
+        self._run_seconds_total = 0.0
+
+    # -------------------------------------
+    # Submission
+    # -------------------------------------
+    def submit(self, kind: str, func, *args, **kwargs) -> str:
+        """
+        Queues `func(*args, **kwargs)` and returns the new job ID.
+
+        Raises:
+        - JobQueueFull: If `max_queue` jobs are already waiting for a worker.
+        """
+        with self._lock:
+            if self._count(QUEUED) >= self.max_queue:
+                self._totals["rejected"] += 1
+                raise JobQueueFull(f"Job queue is full ({self.max_queue} jobs waiting)")
+
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "kind": kind,
+                "status": QUEUED,
+                "submitted_at": _utc_now(),
+                "started_at": None,
+                "finished_at": None,
+                "queue_seconds": None,
+                "run_seconds": None,
+                "result": None,
+                "error": None,
+                "_submitted": time.monotonic(),
+            }
+            self._totals["submitted"] += 1
+            self._prune()
+
+        self._executor.submit(self._run, job_id, func, args, kwargs)
+        return job_id
+
+    def _run(self, job_id, func, args, kwargs):
+        started = time.monotonic()
+        with self._lock:
+            job = self._jobs[job_id]
+            job["status"] = RUNNING
+            job["started_at"] = _utc_now()
+            job["queue_seconds"] = round(started - job["_submitted"], 3)
+
+        try:
+            result, error, status = func(*args, **kwargs), None, COMPLETED
+        except Exception as e:
+            traceback.print_exc()
+            result, error, status = None, str(e), FAILED
+
+        finished = time.monotonic()
+        with self._lock:
+            job["status"] = status
+            job["result"] = result
+            job["error"] = error
+            job["finished_at"] = _utc_now()
+            job["run_seconds"] = round(finished - started, 3)
+            self._totals[status] += 1
+            self._queue_seconds_total += job["queue_seconds"]
+            self._run_seconds_total += job["run_seconds"]
+            self._prune()
+
+    # -------------------------------------
+    # Lookups
+    # -------------------------------------
+    def get(self, job_id: str, include_result: bool = False):
+        """
+        Returns a copy of the job record, or None if the job ID is unknown.
+        The result payload is only included when `include_result` is True.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            view = {k: v for k, v in job.items() if not k.startswith("_")}
+            if not include_result:
+                view.pop("result")
+            return view
+
+    def stats(self) -> dict:
+        """Reports pool size, queue depth and average per-job timings."""
+        with self._lock:
+            finished = self._totals["completed"] + self._totals["failed"]
+            return {
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queued": self._count(QUEUED),
+                "running": self._count(RUNNING),
+                **self._totals,
+                "avg_queue_seconds": round(self._queue_seconds_total / finished, 3) if finished else None,
+                "avg_run_seconds": round(self._run_seconds_total / finished, 3) if finished else None,
+            }
+
+    # -------------------------------------
+    # Internal Helpers (call with lock held)
+    # -------------------------------------
+    def _count(self, status):
+        return sum(1 for job in self._jobs.values() if job["status"] == status)
+
+    def _prune(self):
+        """Drops the oldest finished jobs once more than `retention` are stored."""
+        finished = [job_id for job_id, job in self._jobs.items() if job["status"] in (COMPLETED, FAILED)]
+        for job_id in finished[:max(0, len(finished) - self.retention)]:
+            del self._jobs[job_id]
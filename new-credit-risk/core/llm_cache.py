@@ -0,0 +1,175 @@
+# =====================================
+# LLM Response Cache
+# =====================================
+# Persistent, content-addressed cache for Azure AI agent replies.
+# Credit scoring, compliance, fraud and explainability prompts are built
+# deterministically from the bureau summary, so rerunning the same company
+# sends identical prompts. Replies are stored in SQLite keyed by
+# sha256(agent ID + model/version tag + messages + instructions); a hit skips
+# the thread/run round trips entirely. Entries expire after a TTL and the
+# least recently used ones are evicted once the cache is full.
+
+import os                   # Cache location and limits from the environment
+import json                 # Canonical serialization of the cache key
+import time                 # Entry timestamps for TTL and LRU
+import sqlite3              # Local disk backend
+import hashlib              # Content-addressed keys
+import threading            # Guards the shared connection and counters
+
+# =====================================
+# Configuration
+# =====================================
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join("output_data", "llm_cache.sqlite"))
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))      # 1 day
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000"))
+LLM_CACHE_VERSION = os.getenv("LLM_CACHE_VERSION", "1")  # Bump to invalidate every stored reply
+
+# =====================================
+# Cache Keys
+# =====================================
+
+def model_tag(agent) -> str:
+    """
+    Builds the model/version part of the cache key for an agent handle.
+    Changing the agent's model or instructions (or LLM_CACHE_VERSION) yields new keys.
+    """
+    instructions = getattr(agent, "instructions", None) or ""
+    instructions_hash = hashlib.sha256(instructions.encode("utf-8")).hexdigest()[:16]
+    return f"{getattr(agent, 'model', None)}|{instructions_hash}|v{LLM_CACHE_VERSION}"
+
+
+def make_key(agent_id: str, tag: str, messages: list, instructions: str = None) -> str:
+    """
+    Returns the content address of an agent request.
+
+    Parameters:
+    - agent_id (str): Azure AI agent ID.
+    - tag (str): Model/version tag from model_tag().
+    - messages (list): (role, content) pairs sent on the thread.
+    - instructions (str): Run-level instructions, if any.
+
+    Returns:
+    - str: Hex sha256 digest.
+    """
+    payload = json.dumps(
+        {"agent_id": agent_id, "tag": tag, "messages": [list(m) for m in messages], "instructions": instructions},
+        sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+# =====================================
+# SQLite Cache
+# =====================================
+
+class LLMResponseCache:
+    """
+    SQLite-backed reply cache with TTL expiry, LRU eviction and hit/miss counters.
+
+    Parameters:
+    - path (str): SQLite database file.
+    - ttl (int): Seconds an entry stays valid.
+    - max_entries (int): Entries kept before the least recently used are evicted.
+    """
+
+    def __init__(self, path: str = LLM_CACHE_PATH, ttl: int = LLM_CACHE_TTL_SECONDS,
+                 max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "expired": 0, "writes": 0, "evictions": 0}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                   key TEXT PRIMARY KEY,
+                   agent_id TEXT NOT NULL,
+                   response TEXT NOT NULL,
+                   created_at REAL NOT NULL,
+                   last_access REAL NOT NULL
+               )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)")
+        self._conn.commit()
+
+    def get(self, key: str):
+        """Returns the cached reply for `key`, or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._counters["misses"] += 1
+                return None
+            response, created_at = row
+            if now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self._counters["expired"] += 1
+                self._counters["misses"] += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self._counters["hits"] += 1
+            return response
+
+    def set(self, key: str, agent_id: str, response: str):
+        """Stores a reply and evicts the least recently used entries beyond `max_entries`."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, agent_id, response, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, agent_id, response, now, now)
+            )
+            self._counters["writes"] += 1
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+            evicted = self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            ).rowcount
+            self._counters["evictions"] += max(evicted, 0)
+            self._conn.commit()
+
+    def clear(self):
+        """Removes every cached reply (counters are kept)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """Reports hit/miss counters, hit rate and current size."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                "enabled": LLM_CACHE_ENABLED,
+                "path": self.path,
+                "ttl_seconds": self.ttl,
+                "max_entries": self.max_entries,
+                "entries": entries,
+                **self._counters,
+                "hit_rate": round(self._counters["hits"] / lookups, 3) if lookups else None,
+            }
+
+# =====================================
+# Shared Instance
+# =====================================
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Returns the process-wide cache (opened on first use)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMResponseCache()
+        return _cache
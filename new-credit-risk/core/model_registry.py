@@ -0,0 +1,197 @@
+# =====================================
+# Model Registry
+# =====================================
+# Loads each serialized model artifact once per process and keeps it in memory.
+# Pipelines used to call joblib.load(...) on every request, unpickling the fraud
+# RandomForest (and rebuilding its trees) each time. The registry loads artifacts
+# on first use (or up front via warm_up) and records how long each load took and
+# how much memory the loaded model holds. Objects derived from a model (such as a SHAP
+# explainer) can be registered as companions and are built once, right after
+# the model loads.
+
+import os                   # Artifact paths
+import sys                  # Object sizes for the memory footprint
+import time                 # Load timings
+import types                # Code objects skipped when sizing a model
+import joblib               # Model deserialization
+import threading            # One load per artifact, even under concurrent requests
+import numpy as np          # Array buffers counted in the memory footprint
+
+# =====================================
+# Registered Artifacts
+# =====================================
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # new-credit-risk/
+
+MODEL_PATHS = {
+    "fraud": os.path.join(BASE_DIR, "agents", "fraud_detection", "fraud_model.joblib"),
+    "explainability": os.path.join(BASE_DIR, "agents", "explainability_agent", "final_pipeline.pkl"),
+    "credit_scoring": os.path.join(BASE_DIR, "agents", "credit_scoring", "credit_scoring_model.joblib"),
+}
+
+# =====================================
+# Memory Footprint
+# =====================================
+
+# Shared by every model (classes, functions, modules), so not counted as part of one
+_SHARED_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+
+def deep_sizeof(obj) -> int:
+    """
+    Estimates the bytes held by an object graph, e.g. a fitted estimator.
+
+    Walks containers, instance attributes and NumPy arrays (counting each buffer once).
+    Extension types without a __dict__, such as scikit-learn's Tree, are walked through
+    their __getstate__. Unlike tracemalloc this does not trace the whole process, so loads
+    running concurrently (or other threads) do not skew each other's numbers.
+
+    Parameters:
+    - obj: Root object.
+
+    Returns:
+    - int: Approximate size in bytes.
+    """
+    seen, size, stack = {}, 0, [obj]  # seen keeps objects alive, so ids of temporary states are not reused
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, _SHARED_TYPES):
+            continue
+        seen[id(current)] = current
+        size += sys.getsizeof(current)
+        if isinstance(current, np.ndarray):
+            if isinstance(current.base, np.ndarray):
+                stack.append(current.base)   # A view: count the owning array's buffer once
+            elif current.base is not None:
+                size += current.nbytes       # Buffer owned by another object (e.g. a Tree's nodes)
+            elif current.dtype == object:
+                stack.extend(current.ravel().tolist())
+        elif isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        elif isinstance(current, (str, bytes, bytearray, int, float, complex, bool)) or current is None:
+            continue
+        elif hasattr(current, "__dict__"):
+            stack.append(current.__dict__)
+        elif hasattr(current, "__getstate__"):
+            try:
+                state = current.__getstate__()
+            except Exception:
+                continue
+            if state is not None:
+                stack.append(state)
+    return size
+
+# =====================================
+# Registry
+# =====================================
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded model artifacts.
+
+    Parameters:
+    - paths (dict): Model name -> artifact path.
+    """
+
+    def __init__(self, paths: dict = MODEL_PATHS):
+        self.paths = dict(paths)
+        self._models = {}
+        self._info = {}
+        self._locks = {name: threading.Lock() for name in self.paths}
+        self._builders = {name: {} for name in self.paths}    # name -> {key: builder(model)}
+        self._companions = {name: {} for name in self.paths}  # name -> {key: built object}
+
+    def get(self, name: str):
+        """
+        Returns the loaded model, loading it on first use.
+
+        Raises:
+        - KeyError: If no artifact is registered under `name`.
+        """
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        if name not in self.paths:
+            raise KeyError(f"Unknown model: {name}")
+        with self._locks[name]:
+            if name not in self._models:
+                model = self._load(name)
+                for key, builder in self._builders[name].items():
+                    self._build_companion(name, key, builder, model)
+                self._models[name] = model
+            return self._models[name]
+
+    def add_companion(self, name: str, key: str, builder):
+        """
+        Registers `builder(model)` to run once when model `name` loads (immediately if already loaded).
+
+        Parameters:
+        - name (str): Registered model name.
+        - key (str): Name of the derived object (see get_companion).
+        - builder (callable): Receives the loaded model and returns the derived object.
+        """
+        with self._locks[name]:
+            self._builders[name][key] = builder
+            if name in self._models:
+                self._build_companion(name, key, builder, self._models[name])
+
+    def get_companion(self, name: str, key: str):
+        """Returns an object registered with add_companion, loading its model first if needed."""
+        self.get(name)
+        return self._companions[name][key]
+
+    def _build_companion(self, name, key, builder, model):
+        started = time.perf_counter()
+        self._companions[name][key] = builder(model)
+        self._info[name].setdefault("companions", {})[key] = {
+            "build_seconds": round(time.perf_counter() - started, 4)
+        }
+
+    def _load(self, name: str):
+        path = self.paths[name]
+        started = time.perf_counter()
+        model = joblib.load(path)
+        load_seconds = time.perf_counter() - started  # Timed untraced, so concurrent loads do not slow each other down
+
+        self._info[name] = {
+            "path": os.path.relpath(path, BASE_DIR),
+            "file_bytes": os.path.getsize(path),
+            "load_seconds": round(load_seconds, 4),
+            "memory_bytes": deep_sizeof(model),
+        }
+        print(f"Loaded model '{name}' in {load_seconds:.3f}s ({self._info[name]['memory_bytes'] / 1e6:.1f} MB)")
+        return model
+
+    def warm_up(self, names=None) -> dict:
+        """
+        Loads the given models (all registered models by default) ahead of the first request.
+
+        Returns:
+        - dict: stats() after loading.
+        """
+        for name in names or self.paths:
+            self.get(name)
+        return self.stats()
+
+    def stats(self) -> dict:
+        """
+        Reports load state, load time and memory footprint per model.
+        memory_bytes is deep_sizeof() of the loaded model (its arrays, attributes and
+        containers), measured after the load and excluding shared classes and modules.
+        """
+        return {
+            name: {"loaded": name in self._models, **self._info.get(name, {})}
+            for name in self.paths
+        }
+
+
+# Shared registry used by all pipelines
+model_registry = ModelRegistry()
+
+
+def get_model(name: str):
+    """Shortcut for model_registry.get(name)."""
+    return model_registry.get(name)
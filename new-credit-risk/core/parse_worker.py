@@ -0,0 +1,99 @@
+# =====================================
+# Document Parse Worker
+# =====================================
+# Code that runs inside the parse process pool of core/document_reader.py.
+# The pool starts its workers from a forkserver (or with spawn), never by
+# forking the multithreaded app process, so this module is all a worker needs
+# to import: NumPy plus the XLSX/DOCX parsers, and nothing from the app.
+
+import io                   # In-memory file objects for the parsers
+import importlib            # Deferred parser imports
+import numpy as np          # Column-wise string formatting
+
+# =====================================
+# Parsing
+# =====================================
+
+PARSER_MODULES = ("pandas", "openpyxl", "docx")  # XLSX / DOCX parsing (~0.7 s to import)
+
+
+def load_parsers():
+    """
+    Imports the document parsers on first use instead of at app start-up.
+    Preloaded once by the forkserver (its workers are forked with the parsers loaded)
+    and run as the pool initializer, which is a no-op there and imports them under spawn.
+    """
+    for module in PARSER_MODULES:
+        importlib.import_module(module)
+
+
+def serialize_sheet(df: "pd.DataFrame") -> str:
+    """
+    Formats a sheet as one "col: value, col: value" line per row.
+
+    Works column by column on NumPy string arrays (one vectorized str/strip/concat
+    per column) instead of building a Series per row with DataFrame.iterrows and
+    growing a string, so the cost is linear in the number of cells.
+
+    Parameters:
+    - df (pd.DataFrame): Sheet with the header row as column names.
+
+    Returns:
+    - str: Newline-terminated lines, or "" for a sheet without rows.
+    """
+    if df.empty:
+        return ""
+    lines = None
+    for position, col in enumerate(df.columns):
+        # object -> str calls str() on each cell, matching str(row[col]) (nan, Timestamps, ...)
+        values = np.char.strip(df.iloc[:, position].to_numpy(dtype=object).astype(str))
+        cells = np.char.add(f"{str(col).strip()}: ", values)
+        lines = cells if lines is None else np.char.add(np.char.add(lines, ", "), cells)
+    return "\n".join(lines.tolist()) + "\n"
+
+
+def serialize_workbook(data: bytes) -> str:
+    """
+    Converts every sheet of an .xlsx workbook to labelled text lines.
+
+    The openpyxl engine opens the workbook read-only with cached values
+    (read_only=True, data_only=True), streaming rows instead of building the full
+    cell model. Workbooks with several sheets get a "[Sheet: <name>]" line before
+    each sheet's rows; single-sheet output is just the rows.
+
+    Parameters:
+    - data (bytes): Workbook content.
+
+    Returns:
+    - str: Serialized rows of all sheets.
+    """
+    import pandas as pd
+    sheets = pd.read_excel(io.BytesIO(data), sheet_name=None, engine='openpyxl')
+    if len(sheets) == 1:
+        return serialize_sheet(next(iter(sheets.values())))
+    return "".join(f"[Sheet: {name}]\n{serialize_sheet(df)}" for name, df in sheets.items())
+
+
+def parse_document(name: str, data: bytes) -> str:
+    """
+    Extracts text from a downloaded blob (runs inside the parse worker processes).
+
+    Parameters:
+    - name (str): Blob name; the extension selects the parser.
+    - data (bytes): Blob content.
+
+    Returns:
+    - str: Paragraph text for .docx, one labelled line per row (all sheets) for .xlsx, "" otherwise,
+      or an "Error reading ..." line if parsing failed.
+    """
+    lower = name.lower()
+    try:
+        if lower.endswith(".docx"):
+            from docx import Document
+            doc = Document(io.BytesIO(data))
+            return "\n".join(p.text for p in doc.paragraphs if p.text.strip())
+        if lower.endswith(".xlsx"):
+            return serialize_workbook(data)
+        return ""
+    except Exception as e:
+        return f"Error reading {name}: {e}"
@@ -0,0 +1,170 @@
+# =====================================
+# Retrieval Backends
+# =====================================
+# The bureau pipeline indexes and searches chunk documents
+# ({"id", "content", "content_vector"}) through one small interface, so the
+# Azure AI Search index and the in-process local vector index are interchangeable:
+# - "azure": Azure AI Search (SDK for writes, REST for vector queries)
+# - "local": core.vector_index.LocalVectorIndex persisted on disk; no network,
+#   so the pipeline can index and search offline and small per-company corpora
+#   are searched without a round trip
+# Select with VECTOR_BACKEND. Each backend has a `target` string naming the
+# index it writes to; the ingest manifest keeps its records per target.
+
+import os                   # Backend selection and Azure settings
+import json                 # REST payloads
+import threading            # Shared backend instance
+from core.search_transport import get_search_transport  # Pooled HTTP session for Search REST calls
+from core.vector_index import LocalVectorIndex  # Offline vector index
+
+# =====================================
+# Configuration
+# =====================================
+# VECTOR_BACKEND ("azure" or "local"), LOCAL_INDEX_DIR and LOCAL_INDEX_ALGORITHM
+# ("brute", "hnsw" or "auto") are read when the backend is first created, after
+# the caller has loaded its .env file.
+
+SEARCH_API_VERSION = "2023-07-01-preview"
+
+# =====================================
+# Azure AI Search
+# =====================================
+
+class AzureSearchBackend:
+    """
+    Azure AI Search index holding the chunk documents.
+
+    Parameters:
+    - endpoint (str): Search service endpoint.
+    - api_key (str): Admin API key.
+    - index_name (str): Index name.
+    """
+
+    name = "azure"
+
+    def __init__(self, endpoint: str, api_key: str, index_name: str):
+        from azure.search.documents import SearchClient           # Only needed for this backend
+        from azure.core.credentials import AzureKeyCredential
+        self.endpoint = endpoint
+        self.api_key = api_key
+        self.index_name = index_name
+        self.target = f"azure:{endpoint}/{index_name}"  # Ingest manifest key
+        self.client = SearchClient(endpoint=endpoint, index_name=index_name, credential=AzureKeyCredential(api_key))
+
+    def upsert(self, documents: list):
+        self.client.merge_or_upload_documents(documents=documents)
+
+    def delete(self, ids: list):
+        self.client.delete_documents(documents=[{"id": doc_id} for doc_id in ids])
+
+    def list_ids(self, prefix: str = None) -> list:
+        """Returns document IDs, optionally only those of one company (`<prefix>_*`)."""
+        query = f"id:{prefix}_*" if prefix else "*"
+        return [result["id"] for result in self.client.search(query, select=["id"])]
+
+    def vector_search(self, vector: list, k: int = 8, company_id: str = None) -> list:
+        """
+        Runs a vector query against `content_vector`.
+
+        With `company_id`, the query carries a `company_id eq '...'` filter on the
+        filterable company_id field. This API version applies filters before the
+        vector search, so all k results come from that company.
+
+        Returns:
+        - list: {"id", "content", "@search.score"} dicts, best first.
+        """
+        url = f"{self.endpoint}/indexes/{self.index_name}/docs/search?api-version={SEARCH_API_VERSION}"
+        headers = {"Content-Type": "application/json", "api-key": self.api_key}
+        payload = {"vectors": [{"value": list(vector), "fields": "content_vector", "k": k}], "top": k}
+        if company_id:
+            payload["filter"] = "company_id eq '{}'".format(company_id.replace("'", "''"))
+        response = get_search_transport().post(
+            url, operation="vector_search", headers=headers, data=json.dumps(payload)
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"Vector search failed: {response.text}")
+        return response.json().get("value", [])
+
+    def warm_up(self) -> dict:
+        """Opens a pooled connection to the search service (document count request) ahead of the first query."""
+        url = f"{self.endpoint}/indexes/{self.index_name}/docs/$count?api-version={SEARCH_API_VERSION}"
+        response = get_search_transport().get(url, operation="warm_up", headers={"api-key": self.api_key})
+        if response.status_code != 200:
+            raise RuntimeError(f"Search warm-up failed: {response.status_code} {response.text}")
+        return {"backend": self.name, "documents": int(response.text.strip().lstrip("\ufeff"))}
+
+# =====================================
+# Local Vector Index
+# =====================================
+
+class LocalSearchBackend:
+    """
+    In-process vector index persisted under `directory` (see core.vector_index).
+
+    Parameters:
+    - directory (str): Folder for the index files.
+    - algorithm (str): "brute", "hnsw" or "auto".
+    """
+
+    name = "local"
+
+    def __init__(self, directory: str, algorithm: str = "auto"):
+        self.index = LocalVectorIndex(directory, algorithm=algorithm)
+        self.target = f"local:{os.path.abspath(directory)}"  # Ingest manifest key
+
+    def upsert(self, documents: list):
+        self.index.upsert(documents)
+        self.index.save()
+
+    def delete(self, ids: list):
+        self.index.delete(ids)
+        self.index.save()
+
+    def list_ids(self, prefix: str = None) -> list:
+        """Returns document IDs, optionally only those of one company (`<prefix>_*`)."""
+        return self.index.ids(f"{prefix}_" if prefix else "")
+
+    def vector_search(self, vector: list, k: int = 8, company_id: str = None) -> list:
+        """
+        Runs a cosine-similarity query. With `company_id`, only that company's chunks
+        (IDs `<company_id>_*`) are ranked.
+
+        Returns:
+        - list: {"id", "content", "@search.score"} dicts, best first.
+        """
+        return self.index.search(vector, k=k, id_prefix=f"{company_id}_" if company_id else None)
+
+    def warm_up(self) -> dict:
+        """Maps the index files into memory by running one query."""
+        if len(self.index):
+            self.index.search([1.0] * self.index.dim, k=1)
+        return {"backend": self.name, "documents": len(self.index)}
+
+# =====================================
+# Shared Instance
+# =====================================
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_search_backend():
+    """Returns the process-wide retrieval backend selected by VECTOR_BACKEND."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            backend = os.getenv("VECTOR_BACKEND", "azure").lower()
+            if backend == "local":
+                _backend = LocalSearchBackend(
+                    directory=os.getenv("LOCAL_INDEX_DIR", os.path.join("output_data", "vector_index")),
+                    algorithm=os.getenv("LOCAL_INDEX_ALGORITHM", "auto"),
+                )
+            elif backend == "azure":
+                _backend = AzureSearchBackend(
+                    endpoint=os.getenv("BEAURAU-SEARCH-ENDPOINT"),
+                    api_key=os.getenv("BEAURAU-API-KEY"),
+                    index_name=os.getenv("BEAURAU-INDEX-NAME"),
+                )
+            else:
+                raise ValueError(f"Unknown VECTOR_BACKEND '{backend}' (expected 'azure' or 'local')")
+        return _backend
@@ -0,0 +1,152 @@
+# =====================================
+# Azure Search HTTP Transport
+# =====================================
+# One pooled requests.Session for every Azure AI Search REST call
+# (vector queries, schema checks, diagnostics). A bare `requests.post(...)`
+# opens a new TCP + TLS connection each time and has no timeout, so a stalled
+# service can hang a pipeline forever. This transport:
+# - keeps connections alive in a bounded pool (shared across threads)
+# - applies connect/read timeouts to every call
+# - retries throttling / unavailable responses (429, 503) with exponential
+#   backoff, honouring Retry-After
+# - records per-operation latency for the stats endpoint
+
+import os                   # Transport settings from the environment
+import time                 # Latency measurement
+import threading            # Guards the latency stats
+from collections import deque  # Recent latency samples for percentiles
+import requests             # HTTP session
+from requests.adapters import HTTPAdapter  # Connection pool + retries
+from urllib3.util.retry import Retry      # Retry/backoff policy
+
+# =====================================
+# Configuration
+# =====================================
+
+SEARCH_CONNECT_TIMEOUT = float(os.getenv("SEARCH_CONNECT_TIMEOUT", "5"))   # Seconds to open a connection
+SEARCH_READ_TIMEOUT = float(os.getenv("SEARCH_READ_TIMEOUT", "30"))        # Seconds to wait for a response
+SEARCH_MAX_RETRIES = int(os.getenv("SEARCH_MAX_RETRIES", "3"))             # Retries on 429/503 and connection errors
+SEARCH_BACKOFF_FACTOR = float(os.getenv("SEARCH_BACKOFF_FACTOR", "0.5"))   # Backoff: factor * 2^(retry - 1) seconds
+SEARCH_POOL_SIZE = int(os.getenv("SEARCH_POOL_SIZE", "10"))                # Kept-alive connections per host
+RETRY_STATUSES = (429, 503)
+LATENCY_SAMPLES = 256  # Recent calls kept per operation for p50/p95
+
+# =====================================
+# Transport
+# =====================================
+
+class SearchTransport:
+    """
+    Pooled, timeout-aware HTTP session for Azure Search REST calls.
+
+    Parameters:
+    - connect_timeout (float): Seconds to establish a connection.
+    - read_timeout (float): Seconds to wait for response data.
+    - max_retries (int): Retries on 429/503 responses and connection errors.
+    - backoff_factor (float): Base of the exponential backoff between retries.
+    - pool_size (int): Connections kept alive per host.
+    """
+
+    def __init__(self, connect_timeout: float = SEARCH_CONNECT_TIMEOUT, read_timeout: float = SEARCH_READ_TIMEOUT,
+                 max_retries: int = SEARCH_MAX_RETRIES, backoff_factor: float = SEARCH_BACKOFF_FACTOR,
+                 pool_size: int = SEARCH_POOL_SIZE):
+        self.timeout = (connect_timeout, read_timeout)
+        retry = Retry(
+            total=max_retries,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET", "POST"}),  # Search POSTs are read-only queries
+            backoff_factor=backoff_factor,
+            respect_retry_after_header=True,
+            raise_on_status=False,  # Hand the last 429/503 response back to the caller
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def request(self, method: str, url: str, operation: str = "request", **kwargs) -> requests.Response:
+        """
+        Sends a request through the pooled session (retries included) and records its latency.
+
+        Parameters:
+        - method (str): HTTP method.
+        - url (str): Request URL.
+        - operation (str): Name the latency is recorded under (e.g. "vector_search").
+        - kwargs: Passed to requests (headers, json, data, ...); `timeout` overrides the default.
+
+        Returns:
+        - requests.Response: Final response after retries.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        started = time.perf_counter()
+        response = None
+        try:
+            response = self.session.request(method, url, **kwargs)
+            return response
+        finally:
+            self._record(operation, time.perf_counter() - started, response)
+
+    def get(self, url: str, operation: str = "get", **kwargs) -> requests.Response:
+        return self.request("GET", url, operation=operation, **kwargs)
+
+    def post(self, url: str, operation: str = "post", **kwargs) -> requests.Response:
+        return self.request("POST", url, operation=operation, **kwargs)
+
+    # -------------------------------------
+    # Latency Stats
+    # -------------------------------------
+    def _record(self, operation: str, seconds: float, response):
+        retries = 0
+        if response is not None and getattr(response.raw, "retries", None) is not None:
+            retries = len(response.raw.retries.history)
+        with self._lock:
+            entry = self._stats.setdefault(operation, {
+                "calls": 0, "errors": 0, "retries": 0, "total_seconds": 0.0, "max_seconds": 0.0,
+                "samples": deque(maxlen=LATENCY_SAMPLES),
+            })
+            entry["calls"] += 1
+            entry["retries"] += retries
+            entry["total_seconds"] += seconds
+            entry["max_seconds"] = max(entry["max_seconds"], seconds)
+            entry["samples"].append(seconds)
+            if response is None or response.status_code >= 400:
+                entry["errors"] += 1
+
+    def stats(self) -> dict:
+        """Returns per-operation call counts, errors, retries and latency (mean/p50/p95/max, in ms)."""
+        with self._lock:
+            report = {}
+            for operation, entry in self._stats.items():
+                samples = sorted(entry["samples"])
+                report[operation] = {
+                    "calls": entry["calls"],
+                    "errors": entry["errors"],
+                    "retries": entry["retries"],
+                    "mean_ms": round(entry["total_seconds"] / entry["calls"] * 1000, 1),
+                    "p50_ms": round(samples[len(samples) // 2] * 1000, 1),
+                    "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 1),
+                    "max_ms": round(entry["max_seconds"] * 1000, 1),
+                }
+            return report
+
+    def close(self):
+        self.session.close()
+
+# =====================================
+# Shared Instance
+# =====================================
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_search_transport() -> SearchTransport:
+    """Returns the process-wide search transport."""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = SearchTransport()
+        return _transport
@@ -2,12 +2,12 @@
 # Import Required Libraries
 # ===========================
 
-import json  # Used to parse JSON from assistant tool responses
+import json     # Used to parse JSON from assistant tool responses
+import asyncio  # Runs the blocking bureau step off the event loop in the async variant
 
-# Azure authentication and SDKs
-from azure.identity import DefaultAzureCredential  # Automatically handles Azure login credentials
-from azure.ai.projects import AIProjectClient      # Client to interact with Azure AI Agent projects
-from azure.ai.agents.models import ListSortOrder   # Used to sort conversation messages (chronologically)
+# Shared Azure AI agent runs
+from core.azure_clients import CONTROLLER_AGENT_ID              # Controller agent (decides tool flow)
+from core.agent_runs import run_agent, run_agent_async          # Shared sync/async agent thread runs
 
 # Custom AI agent pipelines from your core architecture
 from core.bureau_pipeline import bureau_agent_pipeline  # Summarizes borrower credit history from blob + AI
@@ -15,8 +15,14 @@ from core.tools import (
     run_credit_tool,            # Credit scoring model
     run_fraud_tool,             # Fraud detection logic
     run_explainability_tool,    # Explains model decisions (e.g., SHAP)
-    run_compliance_tool         # Validates decisions against compliance rules
+    run_compliance_tool,        # Validates decisions against compliance rules
+    run_tools_concurrently,     # Runs the selected tools in parallel
+    run_tools_concurrently_async  # Same, for the async pipelines
 )
+from core.credit_pipeline import credit_scoring_pipeline_async
+from core.fraud_pipeline import fraud_detection_pipeline_async
+from core.explainability_pipeline import explainability_agent_pipeline_async
+from core.compliance_pipeline import compliance_agent_pipeline_async
 
 # ===========================
 # Output Template (default response structure)
@@ -33,18 +39,81 @@ output_template = {
 }
 
 # ===========================
-# Azure AI Project Setup
+# Controller Agent Prompt
 # ===========================
 
-# Authenticate with Azure using the default credentials available on the machine/environment
-# (e.g., developer login, service principal, or managed identity)
-project = AIProjectClient(
-    credential=DefaultAzureCredential(),
-    endpoint="https://akshitasurya.services.ai.azure.com/api/projects/CreditRiskAssessor"  # Your project endpoint
-)
+# List of all tools the controller can choose from
+toolset_description = [
+    "credit scoring",
+    "fraud detection",
+    "explainability",
+    "compliance"
+]
+
+# Controller agent instructions — must respond with JSON array of tool names
+CONTROLLER_INSTRUCTIONS = f"""
+You are an AI controller agent. Your job is to read the financial summary and decide which tools to invoke from the toolset below:
+
+Toolset: {toolset_description}
+
+Respond ONLY with a JSON list of tool names to run. Use exact names like:
+- "credit scoring"
+- "fraud detection"
+- "explainability"
+- "compliance"
+
+Do NOT include explanations, markdown, or text outside the JSON list.
+Only respond with: ["credit scoring", "fraud detection"] or similar.
+"""
+
+def _controller_messages(summary: str) -> list:
+    """Input messages for the controller agent (summary + context)."""
+    return [
+        ("user", "Analyze this financial summary and suggest which tools to use:"),
+        ("user", summary)  # Send the actual financial summary
+    ]
+
+# ===========================
+# Shared Pipeline Steps
+# ===========================
+
+def _extract_summary(bureau_output: dict) -> str:
+    """Validates the bureau result and returns its summary text."""
+    # Validate that bureau agent completed successfully
+    if bureau_output.get("status") != "AgentStatus.complete":
+        raise RuntimeError(f"Bureau agent failed: {bureau_output.get('errorMessage')}")
+
+    # Extract the generated financial summary
+    summary = bureau_output.get("summary", "").strip()
+    if not summary:
+        # Use fallback if summary is blank
+        summary = "No detailed financial summary available."
+    return summary
 
-# Retrieve the controller agent (e.g., central planner that decides tool flow)
-agent = project.agents.get_agent("asst_yv7fmqGQwS0xSBs4uE7D6zIO")
+def _parse_tool_selection(tools_response: str) -> list:
+    """Parses the controller's JSON list of tool names."""
+    try:
+        # Safely parse the JSON string to a Python list
+        return json.loads(tools_response or "[]")
+    except Exception:
+        # Handle malformed responses from the agent
+        raise ValueError(f"Agent returned invalid JSON: {tools_response}")
+
+def _select_tools(tools_to_run: list, credit, explainability, fraud, compliance) -> dict:
+    """Maps the controller's selection onto result keys -> tool callables."""
+    # Always run credit scoring and explainability
+    tools = {
+        "credit_scoring": credit,
+        "explainability": explainability
+    }
+
+    # Run optional agents based on the toolset recommendation
+    if "fraud detection" in tools_to_run:
+        tools["fraud_detection"] = fraud
+
+    if "compliance" in tools_to_run:
+        tools["compliance_check"] = compliance
+    return tools
 
 # ===========================
 # Main Smart Pipeline Function
@@ -68,16 +137,7 @@ def run_smart_pipeline():
     # STEP 1: Run Bureau Agent (handles data loading + summary)
     # ---------------------------------------------------------
     bureau_output = bureau_agent_pipeline()  # Handles data fetch and summarization via Azure Blob + AI
-
-    # Validate that bureau agent completed successfully
-    if bureau_output.get("status") != "AgentStatus.complete":
-        raise RuntimeError(f"Bureau agent failed: {bureau_output.get('errorMessage')}")
-
-    # Extract the generated financial summary
-    summary = bureau_output.get("summary", "").strip()
-    if not summary:
-        # Use fallback if summary is blank
-        summary = "No detailed financial summary available."
+    summary = _extract_summary(bureau_output)
 
     # Store bureau result in output
     result["bureau_summary"] = bureau_output
@@ -85,84 +145,51 @@ def run_smart_pipeline():
     # ---------------------------------------------------------
     # STEP 2: Use Controller Agent to Select Tools Dynamically
     # ---------------------------------------------------------
-
-    # Create a new conversation thread for this pipeline run
-    thread = project.agents.threads.create()
-
-    # Provide input messages to the controller agent (summary + context)
-    project.agents.messages.create(
-        thread_id=thread.id,
-        role="user",
-        content="Analyze this financial summary and suggest which tools to use:"
-    )
-    project.agents.messages.create(
-        thread_id=thread.id,
-        role="user",
-        content=summary  # Send the actual financial summary
-    )
-
-    # List of all tools the controller can choose from
-    toolset_description = [
-        "credit scoring",
-        "fraud detection",
-        "explainability",
-        "compliance"
-    ]
-
-    # Controller agent instructions — must respond with JSON array of tool names
-    instructions = f"""
-You are an AI controller agent. Your job is to read the financial summary and decide which tools to invoke from the toolset below:
-
-Toolset: {toolset_description}
-
-Respond ONLY with a JSON list of tool names to run. Use exact names like:
-- "credit scoring"
-- "fraud detection"
-- "explainability"
-- "compliance"
-
-Do NOT include explanations, markdown, or text outside the JSON list.
-Only respond with: ["credit scoring", "fraud detection"] or similar.
-"""
-
-    # Trigger the agent to process the request using the provided instructions
-    project.agents.runs.create_and_process(
-        thread_id=thread.id,
-        agent_id=agent.id,
-        instructions=instructions
-    )
+    tools_response = run_agent(CONTROLLER_AGENT_ID, _controller_messages(summary), instructions=CONTROLLER_INSTRUCTIONS)
 
     # ---------------------------------------------------------
     # STEP 3: Parse Controller Agent Response (tool selection)
     # ---------------------------------------------------------
-
-    # Retrieve all messages in the thread (ordered chronologically)
-    messages = list(project.agents.messages.list(thread_id=thread.id, order=ListSortOrder.ASCENDING))
-
-    # Extract the assistant's final message (tool recommendation in JSON format)
-    tools_response = next((m.text_messages[-1].text.value for m in messages if m.role == "assistant"), "[]")
-
-    try:
-        # Safely parse the JSON string to a Python list
-        tools_to_run = json.loads(tools_response)
-    except Exception:
-        # Handle malformed responses from the agent
-        raise ValueError(f"Agent returned invalid JSON: {tools_response}")
+    tools_to_run = _parse_tool_selection(tools_response)
 
     # ---------------------------------------------------------
     # STEP 4: Run AI Tools (based on controller recommendation)
     # ---------------------------------------------------------
+    tools = _select_tools(tools_to_run, run_credit_tool, run_explainability_tool, run_fraud_tool, run_compliance_tool)
 
-    # Always run credit scoring and explainability
-    result["credit_scoring"] = run_credit_tool(summary)
-    result["explainability"] = run_explainability_tool(summary)
+    # Every tool only needs the bureau summary, so run them concurrently
+    # (each with its own timeout and error capture)
+    result.update(run_tools_concurrently(tools, summary))
 
-    # Run optional agents based on the toolset recommendation
-    if "fraud detection" in tools_to_run:
-        result["fraud_detection"] = run_fraud_tool(summary)
+    # Return the structured dictionary containing all outputs
+    return result
 
-    if "compliance" in tools_to_run:
-        result["compliance_check"] = run_compliance_tool(summary)
 
-    # Return the structured dictionary containing all outputs
+async def run_smart_pipeline_async():
+    """
+    Async version of run_smart_pipeline.
+
+    The bureau step (blob download + embedding) runs on a worker thread; the controller
+    and the selected tools use the async Azure AI Projects client and overlap on the event loop.
+    """
+    result = output_template.copy()
+
+    # STEP 1: Bureau Agent (blocking I/O and CPU work, so keep it off the event loop)
+    bureau_output = await asyncio.to_thread(bureau_agent_pipeline)
+    summary = _extract_summary(bureau_output)
+    result["bureau_summary"] = bureau_output
+
+    # STEP 2-3: Controller agent selects the tools
+    tools_response = await run_agent_async(
+        CONTROLLER_AGENT_ID, _controller_messages(summary), instructions=CONTROLLER_INSTRUCTIONS
+    )
+    tools_to_run = _parse_tool_selection(tools_response)
+
+    # STEP 4: Run the selected tools concurrently
+    tools = _select_tools(
+        tools_to_run,
+        credit_scoring_pipeline_async, explainability_agent_pipeline_async,
+        fraud_detection_pipeline_async, compliance_agent_pipeline_async
+    )
+    result.update(await run_tools_concurrently_async(tools, summary))
     return result
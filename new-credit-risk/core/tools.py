@@ -2,6 +2,11 @@
 # Importing Core Pipelines
 # =======================
 
+import os                                                              # Reads the per-agent timeout setting
+import asyncio                                                         # Concurrent async tool execution
+import time                                                            # Deadline tracking for concurrent tools
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout  # Concurrent tool execution
+
 # Importing the main pipeline functions from each AI agent module
 # Each of these represents a key function of the credit risk & fraud detection system
 
@@ -69,3 +74,61 @@ def run_compliance_tool(summary_text: str) -> dict:
     - dict: Validation results against compliance rules or regulatory guidelines.
     """
     return compliance_agent_pipeline(summary_text)
+
+
+# =======================
+# Concurrent Tool Execution
+# =======================
+
+# Upper bound for a single tool/agent call (seconds)
+AGENT_TIMEOUT_SECONDS = float(os.getenv("AGENT_TIMEOUT_SECONDS", "120"))
+
+def run_tools_concurrently(tools: dict, summary_text: str, timeout: float = AGENT_TIMEOUT_SECONDS) -> dict:
+    """
+    Runs several tools on the same summary at the same time.
+
+    Parameters:
+    - tools (dict): Maps a result key (e.g. "credit_scoring") to a tool runner (e.g. run_credit_tool).
+    - summary_text (str): Bureau summary passed to every tool.
+    - timeout (float): Seconds each tool may take, counted from when the batch starts.
+
+    Returns:
+    - dict: Result key -> tool output. A tool that raises or times out yields {"error": ...}
+      without affecting the others, so total latency is roughly that of the slowest tool.
+    """
+    pool = ThreadPoolExecutor(max_workers=max(1, len(tools)), thread_name_prefix="agent-tool")
+    futures = {key: pool.submit(tool, summary_text) for key, tool in tools.items()}
+    deadline = time.monotonic() + timeout
+
+    results = {}
+    for key, future in futures.items():
+        try:
+            results[key] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FuturesTimeout:
+            future.cancel()
+            results[key] = {"error": f"{key} timed out after {timeout}s"}
+        except Exception as e:
+            results[key] = {"error": str(e)}
+
+    # Do not block on tools that timed out; their threads finish in the background
+    pool.shutdown(wait=False)
+    return results
+
+
+async def run_tools_concurrently_async(tools: dict, summary_text: str, timeout: float = AGENT_TIMEOUT_SECONDS) -> dict:
+    """
+    Async version of run_tools_concurrently for coroutine tools (e.g. credit_scoring_pipeline_async).
+
+    Returns:
+    - dict: Result key -> tool output, with {"error": ...} for tools that raised or timed out.
+    """
+    async def run_one(key, tool):
+        try:
+            return await asyncio.wait_for(tool(summary_text), timeout=timeout)
+        except asyncio.TimeoutError:
+            return {"error": f"{key} timed out after {timeout}s"}
+        except Exception as e:
+            return {"error": str(e)}
+
+    outputs = await asyncio.gather(*(run_one(key, tool) for key, tool in tools.items()))
+    return dict(zip(tools.keys(), outputs))
@@ -0,0 +1,192 @@
+# =====================================
+# Warm-up & Readiness
+# =====================================
+# Runs the expensive first-use work of a worker on a background thread right
+# after startup (loading the ML models and the SHAP explainer, loading the
+# SentenceTransformer and embedding the bureau query, opening the pooled search
+# connection, resolving the Azure agent handles) and records the state and
+# timing of every component. The /ready endpoint reports this, so a load
+# balancer only routes traffic to workers whose components are all warm.
+# Components that fail (e.g. Azure unreachable) are retried a few times.
+
+import os                   # Retry / optional-component settings from the environment
+import time                 # Component timings
+import threading            # Background warm-up thread, guards the component table
+from collections import OrderedDict  # Components run in registration order
+from datetime import datetime, timezone  # Timestamps in the readiness report
+
+# =====================================
+# Configuration
+# =====================================
+
+WARMUP_MAX_ATTEMPTS = int(os.getenv("WARMUP_MAX_ATTEMPTS", "3"))        # Tries per component
+WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", "30"))   # Pause between attempts
+# Comma-separated components that are warmed up but do not block readiness
+WARMUP_OPTIONAL = {name.strip() for name in os.getenv("WARMUP_OPTIONAL", "").split(",") if name.strip()}
+
+# Component states
+COLD = "cold"
+WARMING = "warming"
+WARM = "warm"
+FAILED = "failed"
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+# =====================================
+# Warm-up Steps
+# =====================================
+
+def warm_models() -> dict:
+    """Loads every registered ML model (and companions such as the SHAP explainer)."""
+    from core.model_registry import model_registry
+    stats = model_registry.warm_up()
+    return {name: info.get("load_seconds") for name, info in stats.items()}
+
+
+def warm_embeddings() -> dict:
+    """Loads the SentenceTransformer and embeds the constant bureau query into the embedding cache."""
+    from core.embeddings import get_embedding_model, embed_texts_cached
+    from core.bureau_pipeline import QUERY_TEXT
+    model = get_embedding_model()
+    vector = embed_texts_cached(model, [QUERY_TEXT])
+    return {"dimension": int(vector.shape[1])}
+
+
+def warm_search() -> dict:
+    """Creates the retrieval backend and opens its connection (or maps the local index)."""
+    from core.search_backends import get_search_backend
+    return get_search_backend().warm_up()
+
+
+def _agent_ids() -> list:
+    from core import azure_clients
+    ids = [azure_clients.CREDIT_SCORING_AGENT_ID, azure_clients.FRAUD_AGENT_ID, azure_clients.COMPLIANCE_AGENT_ID,
+           azure_clients.EXPLAINABILITY_AGENT_ID, azure_clients.CONTROLLER_AGENT_ID]
+    return list(dict.fromkeys(ids))  # Some agents share an ID
+
+
+def warm_agents() -> dict:
+    """Creates the shared AIProjectClient (token + connection) and resolves every agent handle."""
+    from core.azure_clients import get_agent
+    return {"agents": [get_agent(agent_id).id for agent_id in _agent_ids()]}
+
+
+async def warm_agents_async() -> dict:
+    """Same as warm_agents for the async client of the running event loop (e.g. the SK loop)."""
+    from core.azure_clients import get_agent_async
+    return {"agents": [(await get_agent_async(agent_id)).id for agent_id in _agent_ids()]}
+
+# =====================================
+# Warm-up Tracker
+# =====================================
+
+class Warmup:
+    """
+    Runs registered warm-up steps once, in order, and reports per-component readiness.
+
+    Parameters:
+    - enabled (bool): If False nothing is warmed up and the worker counts as ready
+      (components then load lazily on the first request that needs them).
+    - max_attempts (int): Tries per component before it stays failed.
+    - retry_seconds (float): Pause before retrying failed components.
+    - optional (set): Components that do not block readiness.
+    """
+
+    def __init__(self, enabled: bool = True, max_attempts: int = WARMUP_MAX_ATTEMPTS,
+                 retry_seconds: float = WARMUP_RETRY_SECONDS, optional: set = WARMUP_OPTIONAL):
+        self.enabled = enabled
+        self.max_attempts = max(1, max_attempts)
+        self.retry_seconds = retry_seconds
+        self.optional = set(optional)
+        self._steps = OrderedDict()
+        self._components = OrderedDict()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._started_at = None
+        self._finished_at = None
+
+    def add(self, name: str, step, required: bool = True):
+        """
+        Registers a warm-up step.
+
+        Parameters:
+        - name (str): Component name shown by status().
+        - step (callable): Does the warm-up; a dict it returns is shown as the component's details.
+        - required (bool): Whether the component must be warm for the worker to be ready.
+        """
+        with self._lock:
+            self._steps[name] = step
+            self._components[name] = {
+                "state": COLD,
+                "required": required and name not in self.optional,
+                "attempts": 0,
+                "seconds": None,
+                "error": None,
+                "details": None,
+            }
+
+    def start(self) -> threading.Thread:
+        """Runs all steps on a daemon thread (no-op when disabled or already started)."""
+        with self._lock:
+            if not self.enabled or self._thread is not None:
+                return self._thread
+            self._thread = threading.Thread(target=self.run, name="warm-up", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def run(self) -> dict:
+        """Runs every step, retrying failed ones, and returns status()."""
+        self._started_at = _utc_now()
+        pending = list(self._steps)
+        for attempt in range(1, self.max_attempts + 1):
+            if attempt > 1:
+                time.sleep(self.retry_seconds)
+            pending = [name for name in pending if not self._run_step(name)]
+            if not pending:
+                break
+        self._finished_at = _utc_now()
+        return self.status()
+
+    def _run_step(self, name: str) -> bool:
+        component = self._components[name]
+        with self._lock:
+            component["state"] = WARMING
+            component["attempts"] += 1
+        started = time.perf_counter()
+        try:
+            details = self._steps[name]()
+            details = details if isinstance(details, dict) else None
+            state, error = WARM, None
+        except Exception as e:
+            details, state, error = None, FAILED, f"{type(e).__name__}: {e}"
+            print(f"Warm-up of {name} failed (attempt {component['attempts']}): {error}")
+        with self._lock:
+            component.update(state=state, error=error, details=details,
+                             seconds=round(time.perf_counter() - started, 3))
+        return state == WARM
+
+    def is_ready(self) -> bool:
+        """True when every required component is warm (always True when warm-up is disabled)."""
+        if not self.enabled:
+            return True
+        with self._lock:
+            return all(c["state"] == WARM for c in self._components.values() if c["required"])
+
+    def status(self) -> dict:
+        """
+        Reports readiness and the state, attempts, duration, error and details of each component.
+
+        Returns:
+        - dict: {"ready", "enabled", "started_at", "finished_at", "components": {name: {...}}}
+        """
+        ready = self.is_ready()
+        with self._lock:
+            return {
+                "ready": ready,
+                "enabled": self.enabled,
+                "started_at": self._started_at,
+                "finished_at": self._finished_at,
+                "components": {name: dict(component) for name, component in self._components.items()},
+            }
@@ -1,6 +1,9 @@
 import json
-import requests
-from sentence_transformers import SentenceTransformer
+import glob
+import tempfile
+from core.embeddings import embed_texts_cached, get_embedding_model
+from core.vector_index import LocalVectorIndex
+from core.search_transport import get_search_transport
 from azure.search.documents import SearchClient
 from azure.core.credentials import AzureKeyCredential
 
@@ -17,13 +20,15 @@ INDEX_NAME = os.getenv("BEAURAU-INDEX-NAME")
 
 print(AZURE_SEARCH_ENDPOINT, AZURE_SEARCH_KEY, INDEX_NAME)
 
-# Initialize
-embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+# Initialize (all REST calls share one pooled session with timeouts and 429/503 retries)
+transport = get_search_transport()
+embedding_model = get_embedding_model()  # Shared, lazily loaded SentenceTransformer
+# No search service configured: only the local vector index test can pass
 search_client = SearchClient(
     endpoint=AZURE_SEARCH_ENDPOINT,
     index_name=INDEX_NAME,
     credential=AzureKeyCredential(AZURE_SEARCH_KEY)
-)
+) if AZURE_SEARCH_ENDPOINT and AZURE_SEARCH_KEY else None
 
 def check_index_schema():
     """Check the actual index schema"""
@@ -38,7 +43,7 @@ def check_index_schema():
     }
     
     try:
-        response = requests.get(url, headers=headers)
+        response = transport.get(url, operation="index_schema", headers=headers)
         print(f"Index schema request status: {response.status_code}")
         
         if response.status_code == 200:
@@ -88,7 +93,7 @@ def test_simple_search():
     }
     
     try:
-        response = requests.post(url, headers=headers, data=json.dumps(payload))
+        response = transport.post(url, operation="simple_search", headers=headers, data=json.dumps(payload))
         print(f"Simple search status: {response.status_code}")
         
         if response.status_code == 200:
@@ -128,7 +133,7 @@ def test_vector_search_minimal():
     
     # Create a simple test vector
     test_query = "financial information"
-    query_vector = embedding_model.encode(test_query).tolist()
+    query_vector = embed_texts_cached(embedding_model, [test_query])[0].tolist()
     print(f"Generated vector with {len(query_vector)} dimensions")
     
     url = f"{AZURE_SEARCH_ENDPOINT}/indexes/{INDEX_NAME}/docs/search?api-version=2023-07-01-preview"
@@ -153,7 +158,7 @@ def test_vector_search_minimal():
     print(json.dumps(payload, indent=2))
     
     try:
-        response = requests.post(url, headers=headers, data=json.dumps(payload))
+        response = transport.post(url, operation="vector_search", headers=headers, data=json.dumps(payload))
         print(f"\nVector search status: {response.status_code}")
         
         if response.status_code == 200:
@@ -177,7 +182,7 @@ def test_hybrid_search():
     print("="*60)
     
     test_query = "assets liabilities financial"
-    query_vector = embedding_model.encode(test_query).tolist()
+    query_vector = embed_texts_cached(embedding_model, [test_query])[0].tolist()
     
     url = f"{AZURE_SEARCH_ENDPOINT}/indexes/{INDEX_NAME}/docs/search?api-version=2023-07-01-preview"
     headers = {
@@ -199,7 +204,7 @@ def test_hybrid_search():
     }
     
     try:
-        response = requests.post(url, headers=headers, data=json.dumps(payload))
+        response = transport.post(url, operation="hybrid_search", headers=headers, data=json.dumps(payload))
         print(f"Hybrid search status: {response.status_code}")
         
         if response.status_code == 200:
@@ -229,6 +234,7 @@ def test_company_filtering():
     
     # Test different filter syntaxes
     filter_tests = [
+        ("Company ID field", "company_id eq 'novasynth'"),
         ("ID prefix search", "search.ismatch('novasynth_*', 'id')"),
         ("ID contains", "contains(id, 'novasynth')"),
         ("ID starts with", "startswith(id, 'novasynth')"),
@@ -245,7 +251,7 @@ def test_company_filtering():
         }
         
         try:
-            response = requests.post(url, headers=headers, data=json.dumps(payload))
+            response = transport.post(url, operation="company_filter", headers=headers, data=json.dumps(payload))
             if response.status_code == 200:
                 results = response.json()
                 doc_count = len(results.get("value", []))
@@ -289,7 +295,7 @@ def diagnose_vector_dimensions():
     
     # Test embedding dimensions
     test_text = "This is a test"
-    test_vector = embedding_model.encode(test_text)
+    test_vector = embed_texts_cached(embedding_model, [test_text])[0]
     print(f"SentenceTransformer vector dimensions: {len(test_vector)}")
     
     # Check index schema for vector field dimensions
@@ -297,7 +303,7 @@ def diagnose_vector_dimensions():
     headers = {"api-key": AZURE_SEARCH_KEY}
     
     try:
-        response = requests.get(url, headers=headers)
+        response = transport.get(url, operation="vector_dimensions", headers=headers)
         if response.status_code == 200:
             schema = response.json()
             for field in schema.get("fields", []):
@@ -316,6 +322,63 @@ def diagnose_vector_dimensions():
         print(f"Error checking dimensions: {e}")
         return False
 
+def test_local_vector_index():
+    """Test the local vector index (no search service needed)"""
+    print("\n" + "="*60)
+    print("TESTING LOCAL VECTOR INDEX")
+    print("="*60)
+    
+    # Chunk the local summaries the same way the bureau pipeline chunks blob text
+    text = "\n".join(
+        open(path, encoding="utf-8", errors="ignore").read()
+        for path in sorted(glob.glob(os.path.join("output_data", "*.txt")))
+    )
+    chunks = [text[i:i+1000] for i in range(0, len(text), 1000)]
+    if len(chunks) < 10:
+        print("❌ Not enough text in output_data/*.txt to build a test index")
+        return False
+    
+    companies = ["novasynth", "terradrive"]
+    vectors = embed_texts_cached(embedding_model, chunks)
+    documents = [
+        {"id": f"{companies[i % 2]}_{i:04d}", "content": chunk, "content_vector": vector}
+        for i, (chunk, vector) in enumerate(zip(chunks, vectors))
+    ]
+    query_vector = embed_texts_cached(embedding_model, ["What are the total assets and liabilities for the company?"])[0]
+    
+    try:
+        with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as directory:
+            index = LocalVectorIndex(directory, dim=vectors.shape[1], algorithm="hnsw")  # save() builds the graph
+            index.upsert(documents)
+            index.save()
+            
+            # Reload from the memory-mapped files
+            index = LocalVectorIndex(directory)
+            print(f"Indexed {len(index)} chunks ({vectors.shape[1]} dimensions)")
+            
+            exact = index.search(query_vector, k=5, algorithm="brute")
+            graph = index.search(query_vector, k=5, algorithm="hnsw")
+            # Compare by score: repeated chunks have identical vectors, so tied IDs may differ
+            cutoff = exact[-1]["@search.score"] - 1e-6
+            recall = sum(doc["@search.score"] >= cutoff for doc in graph) / len(exact)
+            print(f"Exact top 5: {[doc['id'] for doc in exact]}")
+            print(f"HNSW top 5:  {[doc['id'] for doc in graph]}")
+            print(f"HNSW recall@5: {recall:.2f}")
+            
+            filtered = [doc["id"] for doc in index.search(query_vector, k=5, id_prefix="novasynth_")]
+            print(f"NovaSynth-only results: {filtered}")
+            filter_ok = bool(filtered) and all(doc_id.startswith("novasynth_") for doc_id in filtered)
+        
+        if recall >= 0.8 and filter_ok:
+            print("✅ Local vector index working")
+            return True
+        print("❌ Local vector index results look wrong")
+        return False
+        
+    except Exception as e:
+        print(f"❌ Local vector index error: {e}")
+        return False
+
 def run_all_tests():
     """Run comprehensive diagnostics"""
     print("AZURE SEARCH VECTOR DIAGNOSTIC TOOL")
@@ -329,6 +392,7 @@ def run_all_tests():
         ("Hybrid Search", test_hybrid_search),
         ("Company Filtering", test_company_filtering),
         ("SDK Search", test_sdk_search),
+        ("Local Vector Index", test_local_vector_index),
     ]
     
     results = {}
@@ -354,6 +418,8 @@ def run_all_tests():
     
     if not results.get("Index Schema", False):
         print("🔧 Your index may not exist or have vector search configured")
+        if results.get("Local Vector Index", False):
+            print("🔧 To run the bureau pipeline offline, set VECTOR_BACKEND=local")
     elif not results.get("Vector Dimensions", False):
         print("🔧 Vector dimension mismatch - recreate index with correct dimensions")
     elif not results.get("Vector Search", False):
@@ -0,0 +1,59 @@
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import functools
+import threading
+import asyncio
+import inspect
+import logging
+import os
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Worker threads shared by all sync kernel functions (blob download, embedding, Azure calls)
+PLUGIN_EXECUTOR_WORKERS = int(os.getenv("PLUGIN_EXECUTOR_WORKERS", "8"))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_plugin_executor() -> ThreadPoolExecutor:
+    """Returns the shared plugin thread pool, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            logger.info(f"Starting plugin executor with {PLUGIN_EXECUTOR_WORKERS} workers")
+            _executor = ThreadPoolExecutor(max_workers=PLUGIN_EXECUTOR_WORKERS, thread_name_prefix="sk-plugin")
+        return _executor
+
+
+def shutdown_plugin_executor(wait: bool = True):
+    """Shuts the plugin thread pool down (a new one is created on next use)."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+def run_in_executor(func):
+    """
+    Adapts a sync plugin method into a coroutine that runs on the plugin thread pool.
+
+    Semantic Kernel calls sync kernel functions directly on the event loop, blocking it for
+    the whole call. Wrapped functions are awaited instead, so concurrent kernel invocations
+    and parallel tool calls from the LLM overlap. Apply it below @kernel_function so the
+    kernel still reads the original signature and docstring. Coroutine functions are returned unchanged.
+    """
+    if inspect.iscoroutinefunction(func):
+        return func
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        loop = asyncio.get_running_loop()
+        # Carry context variables (e.g. tracing/logging context) over to the worker thread
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, func, *args, **kwargs)
+        return await loop.run_in_executor(get_plugin_executor(), call)
+
+    return wrapper
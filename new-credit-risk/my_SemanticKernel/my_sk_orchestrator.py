@@ -4,6 +4,8 @@ from semantic_kernel.contents.chat_history import ChatHistory
 from semantic_kernel.functions import KernelArguments
 from semantic_kernel.contents import AuthorRole
 from my_SemanticKernel.plugins import CreditRiskPlugin
+from my_SemanticKernel.pipeline_graph import CREDIT_RISK_GRAPH, resolve_plan
+import asyncio
 import logging
 import json
 import os
@@ -13,6 +15,23 @@ from dotenv import load_dotenv
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Agents that only need the bureau summary: (result key, CreditRisk function name)
+DOWNSTREAM_AGENTS = [
+    ("credit_scoring", "credit_scoring"),
+    ("fraud_detection", "fraud_detection"),
+    ("explainability", "explainability"),
+    ("compliance_check", "compliance_check"),
+]
+
+# Upper bound for a single downstream agent call (seconds)
+AGENT_TIMEOUT_SECONDS = float(os.getenv("AGENT_TIMEOUT_SECONDS", "120"))
+
+# How run_smart_analysis sequences the agents:
+# - "auto":  run the pipeline graph directly when the plan is fixed, else ask the LLM
+# - "graph": always run the pipeline graph (no orchestration LLM)
+# - "llm":   always let the chat model call the functions
+ORCHESTRATION_MODE = os.getenv("SK_ORCHESTRATION_MODE", "auto")
+
 class SemanticKernelOrchestrator:
     def __init__(self):
         logger.info("Initializing SemanticKernelOrchestrator...")
@@ -69,10 +88,39 @@ class SemanticKernelOrchestrator:
             logger.error(f"Error initializing SemanticKernelOrchestrator: {str(e)}")
             raise
 
-    async def run_smart_analysis(self, requirements: list = None) -> dict:
+    async def run_graph_analysis(self, targets: list = None, node_timeout: float = AGENT_TIMEOUT_SECONDS,
+                                 on_result=None) -> dict:
+        """
+        Runs the credit risk pipeline graph directly on the kernel, without the orchestration LLM.
+        Independent agents run concurrently as soon as their inputs are ready.
+        `targets` limits the run to some agents (plus their dependencies); None runs all of them.
+        """
+        logger.info(f"Starting run_graph_analysis with targets: {targets}")
+        outputs, timings = await CREDIT_RISK_GRAPH.run(
+            self.kernel, targets=targets, node_timeout=node_timeout, on_result=on_result
+        )
+        logger.info(f"Graph analysis completed. Node timings: {timings}")
+        
+        result = {
+            "bureau_summary": None,
+            "credit_scoring": None,
+            "fraud_detection": None,
+            "explainability": None,
+            "compliance_check": None
+        }
+        result.update(outputs)
+        return result
+
+    async def run_smart_analysis(self, requirements: list = None, mode: str = None) -> dict:
         try:
             logger.info(f"Starting run_smart_analysis with requirements: {requirements}")
             
+            # Skip the orchestration LLM whenever the requested plan is fixed
+            mode = mode or ORCHESTRATION_MODE
+            plan = resolve_plan(requirements)
+            if mode == "graph" or (mode == "auto" and plan is not None):
+                return await self.run_graph_analysis(targets=plan or None)
+            
             # Initialize result structure matching mock.json
             result = {
                 "bureau_summary": None,
@@ -241,10 +289,47 @@ class SemanticKernelOrchestrator:
             logger.exception("Full traceback:")
             raise
 
-    async def run_credit_analysis(self) -> dict:
-        """Direct kernel invocation - GUARANTEED TO WORK"""
+    async def _invoke_downstream_agent(self, function_name: str, summary_text: str, timeout: float):
+        """
+        Invokes one CreditRisk plugin function on the bureau summary.
+        Timeouts and errors are captured in the returned dict so that one failing
+        agent never cancels the others. Returns None if the function produced no value.
+        """
+        try:
+            logger.info(f"Calling {function_name}...")
+            function = self.kernel.get_function("CreditRisk", function_name)
+            function_result = await asyncio.wait_for(
+                self.kernel.invoke(function, KernelArguments(summary_text=summary_text)),
+                timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            logger.error(f"{function_name} timed out after {timeout}s")
+            return {"error": f"{function_name} timed out after {timeout}s"}
+        except Exception as e:
+            logger.error(f"{function_name} failed: {e}")
+            return {"error": str(e)}
+        
+        if not (function_result and function_result.value):
+            return None
+        
+        data = str(function_result.value)
+        try:
+            parsed = json.loads(data)
+            logger.info(f"✓ {function_name} completed")
+            return parsed
+        except json.JSONDecodeError:
+            return {"summary": data}
+
+    async def run_credit_analysis(self, parallel: bool = True, agent_timeout: float = AGENT_TIMEOUT_SECONDS) -> dict:
+        """
+        Direct kernel invocation - GUARANTEED TO WORK
+
+        Runs bureau analysis first, then the four downstream agents. With `parallel=True`
+        (default) the downstream agents run concurrently, so latency is roughly that of the
+        slowest agent; each agent is bounded by `agent_timeout` seconds.
+        """
         try:
-            logger.info("Starting run_credit_analysis with direct kernel calls...")
+            logger.info(f"Starting run_credit_analysis with direct kernel calls (parallel={parallel})...")
             
             result = {
                 "bureau_summary": None,
@@ -278,77 +363,22 @@ class SemanticKernelOrchestrator:
             if not summary_text:
                 summary_text = "TerraDrive Mobility Corp. financial analysis"
             
-            # Step 2: Get credit scoring
-            try:
-                logger.info("Calling credit_scoring...")
-                credit_function = self.kernel.get_function("CreditRisk", "credit_scoring")
-                credit_args = KernelArguments(summary_text=summary_text)
-                credit_result = await self.kernel.invoke(credit_function, credit_args)
-                
-                if credit_result and credit_result.value:
-                    credit_data = str(credit_result.value)
-                    try:
-                        result["credit_scoring"] = json.loads(credit_data)
-                        logger.info("✓ Credit scoring completed")
-                    except json.JSONDecodeError:
-                        result["credit_scoring"] = {"summary": credit_data}
-            except Exception as e:
-                logger.error(f"Credit scoring failed: {e}")
-                result["credit_scoring"] = {"error": str(e)}
-            
-            # Step 3: Get fraud detection
-            try:
-                logger.info("Calling fraud_detection...")
-                fraud_function = self.kernel.get_function("CreditRisk", "fraud_detection")
-                fraud_args = KernelArguments(summary_text=summary_text)
-                fraud_result = await self.kernel.invoke(fraud_function, fraud_args)
-                
-                if fraud_result and fraud_result.value:
-                    fraud_data = str(fraud_result.value)
-                    try:
-                        result["fraud_detection"] = json.loads(fraud_data)
-                        logger.info("✓ Fraud detection completed")
-                    except json.JSONDecodeError:
-                        result["fraud_detection"] = {"summary": fraud_data}
-            except Exception as e:
-                logger.error(f"Fraud detection failed: {e}")
-                result["fraud_detection"] = {"error": str(e)}
-            
-            # Step 4: Get explainability
-            try:
-                logger.info("Calling explainability...")
-                explain_function = self.kernel.get_function("CreditRisk", "explainability")
-                explain_args = KernelArguments(summary_text=summary_text)
-                explain_result = await self.kernel.invoke(explain_function, explain_args)
-                
-                if explain_result and explain_result.value:
-                    explain_data = str(explain_result.value)
-                    try:
-                        result["explainability"] = json.loads(explain_data)
-                        logger.info("✓ Explainability completed")
-                    except json.JSONDecodeError:
-                        result["explainability"] = {"summary": explain_data}
-            except Exception as e:
-                logger.error(f"Explainability failed: {e}")
-                result["explainability"] = {"error": str(e)}
-            
-            # Step 5: Get compliance check
-            try:
-                logger.info("Calling compliance_check...")
-                compliance_function = self.kernel.get_function("CreditRisk", "compliance_check")
-                compliance_args = KernelArguments(summary_text=summary_text)
-                compliance_result = await self.kernel.invoke(compliance_function, compliance_args)
-                
-                if compliance_result and compliance_result.value:
-                    compliance_data = str(compliance_result.value)
-                    try:
-                        result["compliance_check"] = json.loads(compliance_data)
-                        logger.info("✓ Compliance check completed")
-                    except json.JSONDecodeError:
-                        result["compliance_check"] = {"summary": compliance_data}
-            except Exception as e:
-                logger.error(f"Compliance check failed: {e}")
-                result["compliance_check"] = {"error": str(e)}
+            # Steps 2-5: credit scoring, fraud detection, explainability and compliance
+            # only depend on the bureau summary, so they can run concurrently
+            if parallel:
+                logger.info(f"Running {len(DOWNSTREAM_AGENTS)} downstream agents concurrently...")
+                outputs = await asyncio.gather(*(
+                    self._invoke_downstream_agent(function_name, summary_text, agent_timeout)
+                    for _, function_name in DOWNSTREAM_AGENTS
+                ))
+            else:
+                outputs = []
+                for _, function_name in DOWNSTREAM_AGENTS:
+                    outputs.append(await self._invoke_downstream_agent(function_name, summary_text, agent_timeout))
+            
+            for (result_key, _), output in zip(DOWNSTREAM_AGENTS, outputs):
+                if output is not None:
+                    result[result_key] = output
             
             logger.info("✓ All functions completed successfully via direct invocation")
             return result
@@ -0,0 +1,240 @@
+from semantic_kernel.functions import KernelArguments
+import asyncio
+import logging
+import json
+import time
+from datetime import datetime, timezone
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+FAILED_STATUS = "AgentStatus.failed"
+
+
+def parse_function_result(function_result):
+    """Parses a kernel function result into a dict (JSON if possible). Returns None if empty."""
+    if not (function_result and function_result.value):
+        return None
+    data = str(function_result.value)
+    try:
+        return json.loads(data)
+    except json.JSONDecodeError:
+        return {"summary": data}
+
+
+def failure_record(name: str, description: str, error_message: str) -> dict:
+    """
+    Builds the result of a node that failed, timed out or was skipped, shaped like an agent
+    result (as run_smart_analysis reports agents it could not capture), so the GUI shows it
+    as failed instead of pending.
+    """
+    return {
+        "agentName": name.replace("_", " ").title(),
+        "agentDescription": description,
+        "extractedData": {},
+        "summary": f"ERROR: {error_message}",
+        "completedAt": datetime.now(timezone.utc).isoformat(),
+        "confidenceScore": 0.0,
+        "status": FAILED_STATUS,
+        "errorMessage": error_message
+    }
+
+
+def is_failed(output) -> bool:
+    """True for a missing result or a failure record."""
+    return output is None or output.get("status") == FAILED_STATUS
+
+
+def bureau_summary_arguments(outputs: dict) -> dict:
+    """Builds the `summary_text` argument for downstream agents from the bureau result."""
+    bureau = outputs["bureau_summary"]
+    summary_text = bureau.get("summary") or json.dumps(bureau)
+    return {"summary_text": summary_text}
+
+
+class PipelineNode:
+    """
+    One step of the analysis graph.
+
+    - name: Result key the node's output is stored under (e.g. "credit_scoring").
+    - function_name: CreditRisk plugin function to invoke.
+    - depends_on: Names of nodes whose outputs this node needs.
+    - arguments: Callable mapping {dependency name: output} to the kernel arguments.
+    """
+
+    def __init__(self, name: str, function_name: str, depends_on=(), arguments=None,
+                 plugin_name: str = "CreditRisk"):
+        self.name = name
+        self.function_name = function_name
+        self.depends_on = tuple(depends_on)
+        self.arguments = arguments
+        self.plugin_name = plugin_name
+
+
+class PipelineGraph:
+    """
+    Declarative DAG of CreditRisk plugin functions, where edges are data dependencies.
+
+    `run()` invokes the kernel functions directly (no orchestration LLM) and starts each
+    node as soon as all of its dependencies have finished, giving maximum parallelism.
+    """
+
+    def __init__(self, nodes):
+        self.nodes = {node.name: node for node in nodes}
+        self._order = self._topological_order()
+
+    def _topological_order(self) -> list:
+        order, visiting, done = [], set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Pipeline graph has a cycle at node '{name}'")
+            if name not in self.nodes:
+                raise ValueError(f"Pipeline graph references unknown node '{name}'")
+            visiting.add(name)
+            for dependency in self.nodes[name].depends_on:
+                visit(dependency)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.nodes:
+            visit(name)
+        return order
+
+    def resolve(self, targets=None) -> list:
+        """Returns the requested nodes plus everything they depend on, in dependency order."""
+        if not targets:
+            return list(self._order)
+        needed = set()
+        stack = list(targets)
+        while stack:
+            name = stack.pop()
+            if name not in self.nodes:
+                raise ValueError(f"Unknown pipeline node '{name}'")
+            if name not in needed:
+                needed.add(name)
+                stack.extend(self.nodes[name].depends_on)
+        return [name for name in self._order if name in needed]
+
+    async def run(self, kernel, targets=None, node_timeout: float = None, on_result=None):
+        """
+        Executes the graph on the given kernel.
+
+        Parameters:
+        - kernel: Semantic Kernel with the plugin functions registered.
+        - targets (list): Node names to compute (dependencies are added automatically). None runs all nodes.
+        - node_timeout (float): Seconds each node may take (None for no limit).
+        - on_result (callable): Optional callback `on_result(name, output)` (sync or async) invoked
+          as soon as each node finishes, e.g. for streaming results.
+
+        Returns:
+        - tuple: (outputs, timings) where outputs maps node name -> parsed result (or a failure_record)
+          and timings maps node name -> seconds spent in the node.
+        """
+        names = self.resolve(targets)
+        tasks, outputs, timings = {}, {}, {}
+
+        async def execute(name):
+            node = self.nodes[name]
+            if node.depends_on:
+                await asyncio.gather(*(tasks[dependency] for dependency in node.depends_on))
+
+            failed = [d for d in node.depends_on if is_failed(outputs.get(d))]
+            started = time.perf_counter()
+            if failed:
+                output = failure_record(
+                    name, f"Function {node.function_name} was skipped",
+                    f"Skipped {node.function_name}: dependency {', '.join(failed)} failed"
+                )
+            else:
+                output = await self._invoke(kernel, node, outputs, node_timeout)
+            timings[name] = round(time.perf_counter() - started, 3)
+            outputs[name] = output
+            logger.info(f"Graph node {name} finished in {timings[name]}s")
+
+            if on_result is not None:
+                callback = on_result(name, output)
+                if asyncio.iscoroutine(callback):
+                    await callback
+
+        # Dependencies precede dependents in `names`, so every awaited task already exists
+        for name in names:
+            tasks[name] = asyncio.ensure_future(execute(name))
+        await asyncio.gather(*tasks.values())
+        return outputs, timings
+
+    @staticmethod
+    async def _invoke(kernel, node, outputs, timeout):
+        """Invokes one node, capturing timeouts and errors in a failure_record."""
+        description = f"Function {node.function_name} failed"
+        try:
+            function = kernel.get_function(node.plugin_name, node.function_name)
+            arguments = node.arguments({d: outputs[d] for d in node.depends_on}) if node.arguments else {}
+            function_result = await asyncio.wait_for(
+                kernel.invoke(function, KernelArguments(**arguments)),
+                timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            logger.error(f"{node.function_name} timed out after {timeout}s")
+            return failure_record(node.name, description, f"{node.function_name} timed out after {timeout}s")
+        except Exception as e:
+            logger.error(f"{node.function_name} failed: {e}")
+            return failure_record(node.name, description, str(e))
+
+        output = parse_function_result(function_result)
+        if output is None:
+            return failure_record(node.name, description, f"{node.function_name} returned no data")
+        if "error" in output and "status" not in output:
+            # The plugins report their own failures as {"error": ...}
+            return failure_record(node.name, description, str(output["error"]))
+        return output
+
+
+# =====================================
+# Credit Risk Analysis Graph
+# =====================================
+# bureau_analysis feeds the summary to the four downstream agents, which are independent.
+
+CREDIT_RISK_GRAPH = PipelineGraph([
+    PipelineNode("bureau_summary", "bureau_analysis"),
+    PipelineNode("credit_scoring", "credit_scoring", ["bureau_summary"], bureau_summary_arguments),
+    PipelineNode("fraud_detection", "fraud_detection", ["bureau_summary"], bureau_summary_arguments),
+    PipelineNode("explainability", "explainability", ["bureau_summary"], bureau_summary_arguments),
+    PipelineNode("compliance_check", "compliance_check", ["bureau_summary"], bureau_summary_arguments),
+])
+
+# Names accepted in `requirements` for each node (normalized to lower_snake_case)
+REQUIREMENT_ALIASES = {
+    "bureau": "bureau_summary",
+    "bureau_summary": "bureau_summary",
+    "bureau_analysis": "bureau_summary",
+    "credit": "credit_scoring",
+    "credit_scoring": "credit_scoring",
+    "fraud": "fraud_detection",
+    "fraud_detection": "fraud_detection",
+    "explainability": "explainability",
+    "compliance": "compliance_check",
+    "compliance_check": "compliance_check",
+}
+
+
+def resolve_plan(requirements):
+    """
+    Maps request requirements onto graph nodes.
+
+    Returns:
+    - list: Node names to run (empty list means the full graph), or None if any requirement
+      is not a known agent name, in which case the plan is not fixed and needs the LLM planner.
+    """
+    plan = []
+    for requirement in requirements or []:
+        if not isinstance(requirement, str):
+            return None
+        key = requirement.strip().lower().replace("-", "_").replace(" ", "_")
+        if key not in REQUIREMENT_ALIASES:
+            return None
+        plan.append(REQUIREMENT_ALIASES[key])
+    return plan
@@ -1,9 +1,10 @@
 from semantic_kernel.functions import kernel_function
 from core.bureau_pipeline import bureau_agent_pipeline
-from core.credit_pipeline import credit_scoring_pipeline
-from core.fraud_pipeline import fraud_detection_pipeline
-from core.explainability_pipeline import explainability_agent_pipeline
-from core.compliance_pipeline import compliance_agent_pipeline
+from core.credit_pipeline import credit_scoring_pipeline_async
+from core.fraud_pipeline import fraud_detection_pipeline_async
+from core.explainability_pipeline import explainability_agent_pipeline_async
+from core.compliance_pipeline import compliance_agent_pipeline_async
+from my_SemanticKernel.executor import run_in_executor
 import logging
 import json
 
@@ -15,6 +16,7 @@ class CreditRiskPlugin:
         description="Analyzes and summarizes business documents and financial statements",
         name="bureau_analysis"
     )
+    @run_in_executor  # Blob download + embedding are blocking, run them on the plugin thread pool
     def bureau_analysis(self) -> str:
         """Runs bureau agent pipeline and returns JSON result."""
         logger.info("Starting bureau_analysis function...")
@@ -39,7 +41,7 @@ class CreditRiskPlugin:
         description="Calculates credit risk and assigns AAA–DDD rating",
         name="credit_scoring"
     )
-    def credit_scoring(self, summary_text: str) -> str:
+    async def credit_scoring(self, summary_text: str) -> str:
         """Performs credit scoring analysis and returns JSON result."""
         logger.info(f"Starting credit_scoring function...")
         try:
@@ -54,7 +56,8 @@ class CreditRiskPlugin:
                 actual_summary = summary_text
                 
             logger.info("Calling credit_scoring_pipeline...")
-            result = credit_scoring_pipeline(actual_summary)
+            # Await the async pipeline natively so concurrent agents overlap on the kernel's loop
+            result = await credit_scoring_pipeline_async(actual_summary)
             logger.info("Credit scoring pipeline completed")
             
             return json.dumps(result)
@@ -67,7 +70,7 @@ class CreditRiskPlugin:
         description="Identifies potential fraud indicators and risk factors",
         name="fraud_detection"
     )
-    def fraud_detection(self, summary_text: str) -> str:
+    async def fraud_detection(self, summary_text: str) -> str:
         """Performs fraud detection analysis and returns JSON result."""
         logger.info(f"Starting fraud_detection function...")
         try:
@@ -82,7 +85,8 @@ class CreditRiskPlugin:
                 actual_summary = summary_text
                 
             logger.info("Calling fraud_detection_pipeline...")
-            result = fraud_detection_pipeline(actual_summary)
+            # Await the async pipeline natively so concurrent agents overlap on the kernel's loop
+            result = await fraud_detection_pipeline_async(actual_summary)
             logger.info("Fraud detection pipeline completed")
             
             return json.dumps(result)
@@ -95,7 +99,7 @@ class CreditRiskPlugin:
         description="Provides detailed explanation of analysis decisions and factors",
         name="explainability"
     )
-    def explainability(self, summary_text: str) -> str:
+    async def explainability(self, summary_text: str) -> str:
         """Provides explainability analysis and returns JSON result."""
         logger.info(f"Starting explainability function...")
         try:
@@ -110,7 +114,8 @@ class CreditRiskPlugin:
                 actual_summary = summary_text
                 
             logger.info("Calling explainability_agent_pipeline...")
-            result = explainability_agent_pipeline(actual_summary)
+            # Await the async pipeline natively so concurrent agents overlap on the kernel's loop
+            result = await explainability_agent_pipeline_async(actual_summary)
             logger.info("Explainability pipeline completed")
             
             return json.dumps(result)
@@ -123,7 +128,7 @@ class CreditRiskPlugin:
         description="Checks legal compliance and regulatory requirements",
         name="compliance_check"
     )
-    def compliance_check(self, summary_text: str) -> str:
+    async def compliance_check(self, summary_text: str) -> str:
         """Performs compliance checking and returns JSON result."""
         logger.info(f"Starting compliance_check function...")
         try:
@@ -138,7 +143,8 @@ class CreditRiskPlugin:
                 actual_summary = summary_text
                 
             logger.info("Calling compliance_agent_pipeline...")
-            result = compliance_agent_pipeline(actual_summary)
+            # Await the async pipeline natively so concurrent agents overlap on the kernel's loop
+            result = await compliance_agent_pipeline_async(actual_summary)
             logger.info("Compliance pipeline completed")
             
             # Ensure result is in proper format